@@ -1,17 +1,17 @@
 import streamlit as st
-import io_utils
-import claims
-import search_retrieval
-import stance
-import scoring
-import explain
-import ui_components
 import os
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables before the pipeline modules read their settings
 load_dotenv()
 
+import io_utils
+import claims
+import explain
+import metrics
+import pipeline
+import ui_components
+
 # Set Streamlit page configuration
 st.set_page_config(
     page_title="AI-Powered Misinformation Assistant",
@@ -63,6 +63,7 @@ def main():
         input_file = st.file_uploader("Upload a screenshot (PNG/JPG):", type=["png", "jpg", "jpeg"])
 
     if st.button("Analyze"):
+        metrics.start_trace()
         with st.spinner("Processing..."):
             # Step 1: Claim extraction
             st.markdown("### Step 1: Extracting Claims")
@@ -76,18 +77,43 @@ def main():
                 raw_text = io_utils.extract_text_from_image(input_file.read())
             
             st.session_state.claims = claims.extract_claims(raw_text)
+            st.session_state.card_requested = False
             st.success(f"Found {len(st.session_state.claims)} claims.")
 
             if st.session_state.claims:
                 # Step 2 & 3: Retrieval and Stance
                 st.markdown("### Step 2 & 3: Retrieving Evidence & Assessing Stance")
-                for c in st.session_state.claims:
-                    st.write(f"Analyzing claim: **{c.text}**")
-                    st.session_state.evidence[c.id] = search_retrieval.search_for_evidence(c.text)
-                    st.session_state.judgments[c.id] = stance.classify_stance(c.text, st.session_state.evidence[c.id])
-                    st.session_state.assessments[c.id] = scoring.score_risk(c, st.session_state.judgments[c.id])
-
+                progress = st.progress(0.0, text="Verifying claims...")
+                live_results = st.empty()
+                live_cards = live_results.container()
+                total = len(st.session_state.claims)
+                # Claims are verified concurrently; cards render in completion order.
+                for done, (c, evidence, judgments, assessment) in enumerate(pipeline.verify_claims(st.session_state.claims), start=1):
+                    st.session_state.evidence[c.id] = evidence
+                    st.session_state.judgments[c.id] = judgments
+                    st.session_state.assessments[c.id] = assessment
+                    progress.progress(done / total, text=f"Verified {done} of {total} claims")
+                    pruned = len(evidence) - len(judgments)
+                    if pruned > 0:
+                        st.caption(f"Pruned {pruned} of {len(evidence)} low-relevance snippets for: {c.text}")
+                    with live_cards:
+                        with st.container(border=True):
+                            ui_components.render_result_card(c, judgments, assessment)
+
+                # The full result set is rendered in claim order below.
+                live_results.empty()
+                progress.empty()
+                if os.environ.get("RESULTS_DIR"):
+                    import results_store
+                    results_store.save_results(
+                        os.environ["RESULTS_DIR"],
+                        st.session_state.claims,
+                        st.session_state.judgments,
+                        st.session_state.assessments,
+                        st.session_state.evidence,
+                    )
                 st.success("Analysis complete!")
+        st.session_state.trace = metrics.get_trace()
 
     st.markdown("---")
 
@@ -97,12 +123,15 @@ def main():
             with st.container(border=True):
                 ui_components.render_result_card(c, st.session_state.judgments.get(c.id, []), st.session_state.assessments.get(c.id))
         
-        st.download_button(
-            label="Download Credibility Card",
-            data=explain.generate_credibility_card(st.session_state.claims, st.session_state.judgments, st.session_state.assessments),
-            file_name="credibility_card.pdf",
-            mime="application/pdf",
-        )
+        # The PDF is only rendered once asked for; later reruns reuse the memoized card.
+        if st.session_state.get("card_requested") or st.button("Prepare Credibility Card"):
+            st.session_state.card_requested = True
+            st.download_button(
+                label="Download Credibility Card",
+                data=explain.generate_credibility_card(st.session_state.claims, st.session_state.judgments, st.session_state.assessments),
+                file_name="credibility_card.pdf",
+                mime="application/pdf",
+            )
 
         st.markdown("---")
         st.header("How to Verify")
@@ -113,6 +142,23 @@ def main():
     else:
         st.info("Start by entering a URL, text, or screenshot to analyze.")
     
+    with st.sidebar:
+        with st.expander("Diagnostics"):
+            trace = st.session_state.get("trace")
+            if trace:
+                st.markdown("**Last analysis trace**")
+                origin = min(span["start"] for span in trace)
+                st.dataframe(
+                    [
+                        {"stage": s["stage"], "start_ms": round((s["start"] - origin) * 1000, 1), "duration_ms": s["duration_ms"], "thread": s["thread"], "error": s["error"]}
+                        for s in sorted(trace, key=lambda s: s["start"])
+                    ],
+                    hide_index=True,
+                )
+            st.markdown("**Process metrics**")
+            st.json(metrics.summary(), expanded=False)
+            st.download_button("Prometheus metrics", data=metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+
     st.markdown("---")
     st.markdown("#### Limitations")
     st.markdown("This tool is for educational purposes and should not be used as a sole source of truth. Results are based on available public data and AI model interpretation, which can be limited.")
@@ -0,0 +1,207 @@
+"""Headless bulk verification.
+
+Usage: python batch.py in.jsonl out.jsonl [--workers N] [--claim-workers N] [--store DIR] [--metrics PREFIX]
+
+Each input line is a JSON object with either a "url" or a "text" field and an
+optional "id". Results are appended to the output file as each item finishes,
+and finished ids are recorded in a checkpoint file so an interrupted job can be
+re-run with the same arguments and pick up where it stopped. Items that failed
+are written with their error but not checkpointed, so a re-run retries them and
+appends a new line for the same id.
+"""
+from typing import Iterator, List, Set
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict
+from dotenv import load_dotenv
+import argparse
+import json
+import os
+import sys
+import time
+
+# Pipeline modules read their settings at import time.
+load_dotenv()
+
+from cache import make_key
+import io_utils
+import claims
+import metrics
+import pipeline
+
+# Results are written to the columnar store in groups of this many items.
+STORE_FLUSH_ITEMS = 200
+
+def item_id(record: dict) -> str:
+    """Stable id for an input record: its own "id", else a hash of its content."""
+    if record.get("id") is not None:
+        return str(record["id"])
+    return make_key(record.get("url"), record.get("text"))[:16]
+
+def read_items(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def read_finished_ids(output_path: str, checkpoint_path: str) -> Set[str]:
+    """Ids already completed without error, from the checkpoint and the output itself.
+
+    Reading the output too covers a crash between writing a result and
+    recording it in the checkpoint.
+    """
+    finished = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            finished.update(line.strip() for line in f if line.strip())
+    if os.path.exists(output_path):
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue  # A torn final line from an interrupted write.
+                if result.get("id") is not None and result.get("error") is None:
+                    finished.add(result["id"])
+    return finished
+
+def verify_item(record: dict, claim_workers: int) -> List[pipeline.ClaimResult]:
+    """Runs the full pipeline for one input record; results follow extraction order."""
+    if record.get("url"):
+        raw_text = io_utils.fetch_url_content(record["url"])
+        if io_utils.fetch_failed(raw_text):
+            raise RuntimeError(raw_text or "No article text could be extracted.")
+    else:
+        raw_text = record.get("text", "")
+
+    # A failed extraction must fail the item, not record it as having no claims.
+    extracted = claims.extract_claims(raw_text, raise_errors=True)
+    results = list(pipeline.verify_claims(extracted, max_concurrency=claim_workers))
+    # verify_claims yields in completion order; keep the extraction order.
+    order = {c.id: i for i, c in enumerate(extracted)}
+    results.sort(key=lambda r: order[r[0].id])
+    return results
+
+def serialize_results(results: List[pipeline.ClaimResult]) -> List[dict]:
+    return [
+        {
+            "claim": asdict(c),
+            "evidence": [asdict(e) for e in evidence],
+            "judgments": [asdict(j) for j in judgments],
+            "assessment": asdict(assessment),
+        }
+        for c, evidence, judgments, assessment in results
+    ]
+
+def _store(store_dir: str, results: List[pipeline.ClaimResult]) -> None:
+    """Appends finished claim results to the columnar results store.
+
+    A failed write is reported and the group dropped; the JSONL output still
+    holds those results, so one bad group doesn't stop the job.
+    """
+    if not results:
+        return
+    import results_store
+    try:
+        results_store.save_results(
+            store_dir,
+            [c for c, _, _, _ in results],
+            {c.id: judgments for c, _, judgments, _ in results},
+            {c.id: assessment for c, _, _, assessment in results},
+            {c.id: evidence for c, evidence, _, _ in results},
+        )
+    except Exception as e:
+        print(f"Error writing {len(results)} claim results to {store_dir}: {e}", file=sys.stderr)
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    workers: int = 4,
+    claim_workers: int = 2,
+    checkpoint_path: str = None,
+    store_dir: str = None,
+) -> int:
+    """Verifies every unfinished item in `input_path`; returns how many were processed.
+
+    With `store_dir`, claim results are also appended to the columnar results
+    store every STORE_FLUSH_ITEMS items. The JSONL output stays the record of
+    truth for resuming; a crash can lose at most one unflushed group from the store.
+    """
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+    finished = read_finished_ids(output_path, checkpoint_path)
+    processed = 0
+    unstored = []
+
+    with open(output_path, "a", encoding="utf-8") as out, open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def drain(return_when):
+            nonlocal processed, unstored
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                record_id, record, started = pending.pop(future)
+                try:
+                    results = future.result()
+                    error = None
+                except Exception as e:
+                    results, error = [], str(e)
+                result = {
+                    "id": record_id,
+                    "source": record.get("url") or "text",
+                    "claims": serialize_results(results),
+                    "elapsed_seconds": round(time.time() - started, 3),
+                    "error": error,
+                }
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                if store_dir:
+                    unstored.extend(results)
+                    if processed % STORE_FLUSH_ITEMS == STORE_FLUSH_ITEMS - 1:
+                        _store(store_dir, unstored)
+                        unstored = []
+                # Failed items stay out of the checkpoint so a re-run retries them.
+                if error is None:
+                    checkpoint.write(record_id + "\n")
+                    checkpoint.flush()
+                    os.fsync(checkpoint.fileno())
+                processed += 1
+                print(f"[{processed}] {record_id}: {len(results)} claims" + (f" (error: {error})" if error else ""), file=sys.stderr)
+
+        for record in read_items(input_path):
+            record_id = item_id(record)
+            if record_id in finished:
+                continue
+            finished.add(record_id)
+            pending[executor.submit(verify_item, record, claim_workers)] = (record_id, record, time.time())
+            # Bound the number of queued items so huge inputs aren't read into memory at once.
+            if len(pending) >= workers * 2:
+                drain(FIRST_COMPLETED)
+        while pending:
+            drain(FIRST_COMPLETED)
+        if store_dir:
+            _store(store_dir, unstored)
+    return processed
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verify claims from a JSONL file of URLs or texts.")
+    parser.add_argument("input", help="Input JSONL with a \"url\" or \"text\" field per line.")
+    parser.add_argument("output", help="Output JSONL; results are appended as items finish.")
+    parser.add_argument("--workers", type=int, default=4, help="Items verified concurrently.")
+    parser.add_argument("--claim-workers", type=int, default=2, help="Claims verified concurrently within an item.")
+    parser.add_argument("--checkpoint", help="Checkpoint file (defaults to OUTPUT.checkpoint).")
+    parser.add_argument("--store", help="Also append results to a columnar results store in this directory.")
+    parser.add_argument("--metrics", help="Write run metrics to PREFIX.json and PREFIX.prom when done.")
+    args = parser.parse_args(argv)
+
+    processed = run_batch(args.input, args.output, args.workers, args.claim_workers, args.checkpoint, args.store)
+    print(f"Processed {processed} items.", file=sys.stderr)
+    if args.metrics:
+        with open(args.metrics + ".json", "w", encoding="utf-8") as f:
+            f.write(metrics.summary_json())
+        with open(args.metrics + ".prom", "w", encoding="utf-8") as f:
+            f.write(metrics.to_prometheus())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
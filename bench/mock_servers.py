@@ -0,0 +1,193 @@
+"""Local stand-ins for the OpenAI, SerpAPI and OCR.space HTTP APIs.
+
+Each server answers with deterministic, plausible payloads after a sampled
+latency, and can be configured to fail with 5xx errors or 429 rate limits at a
+given rate. Request counts are kept per server for benchmark reports.
+"""
+from typing import Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+
+class Behavior:
+    """Latency distribution and failure rates for one mock service.
+
+    Latency is log-normal with the given median; `sigma` controls the tail
+    (p95 is roughly median * e^(1.645 * sigma)).
+    """
+    def __init__(self, median_ms: float = 100.0, sigma: float = 0.5, error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 0.2):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+
+    def sample(self) -> tuple:
+        """Returns (delay seconds, outcome) where outcome is "ok", "error" or "rate_limited"."""
+        with self._lock:
+            delay = self.median_ms / 1000.0 * math.exp(self.sigma * self._rng.gauss(0, 1))
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return delay * 0.1, "rate_limited"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, "error"
+        return delay, "ok"
+
+class _MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler, behavior: Behavior):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.behavior = behavior
+        self.counts = {"ok": 0, "error": 0, "rate_limited": 0}
+        self.counts_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "_MockServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _serve(self, respond) -> None:
+        """Applies the sampled latency and failure mode, then calls `respond`."""
+        delay, outcome = self.server.behavior.sample()
+        time.sleep(delay)
+        with self.server.counts_lock:
+            self.server.counts[outcome] += 1
+        if outcome == "rate_limited":
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                            {"Retry-After": str(self.server.behavior.retry_after)})
+        elif outcome == "error":
+            self._send_json(500, {"error": {"message": "Mock server error", "type": "server_error"}})
+        else:
+            respond()
+
+def _stable_choice(text: str, options: list, weights: list):
+    roll = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big") / 2 ** 64
+    cumulative = 0.0
+    for option, weight in zip(options, weights):
+        cumulative += weight
+        if roll < cumulative:
+            return option
+    return options[-1]
+
+STANCE_LABELS = ["SUPPORT", "REFUTE", "NEI"]
+STANCE_WEIGHTS = [0.35, 0.35, 0.30]
+
+class OpenAIHandler(_Handler):
+    """POST /v1/chat/completions for claim extraction and single/batched stance prompts."""
+    def do_POST(self):
+        request = json.loads(self._read_body() or b"{}")
+        self._serve(lambda: self._complete(request))
+
+    def _complete(self, request: dict) -> None:
+        prompt = request["messages"][-1]["content"]
+        if '"judgments"' in prompt:
+            claim = re.search(r'CLAIM: "(.*?)"', prompt, re.S).group(1)
+            judgments = [
+                {"index": int(i), "label": _stable_choice(claim + snippet, STANCE_LABELS, STANCE_WEIGHTS),
+                 "confidence": 0.8, "quote_span": snippet[:60]}
+                for i, snippet in re.findall(r'\[(\d+)\] \(Snippet from [^)]*\): "(.*?)"', prompt)
+            ]
+            content = json.dumps({"judgments": judgments})
+        elif request.get("response_format"):
+            claim = re.search(r'CLAIM: "(.*?)"', prompt, re.S).group(1)
+            snippet = re.search(r'EVIDENCE \(Snippet from [^)]*\): "(.*?)"', prompt, re.S).group(1)
+            content = json.dumps({
+                "label": _stable_choice(claim + snippet, STANCE_LABELS, STANCE_WEIGHTS),
+                "confidence": 0.8,
+                "quote_span": snippet[:60],
+            })
+        else:
+            text = prompt.rsplit('Text: """', 1)[-1].split('"""', 1)[0]
+            sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if len(s.strip()) > 20]
+            content = repr(sentences[:5])
+
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        self._send_json(200, {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+class SerpApiHandler(_Handler):
+    """GET /search returning ten organic results built from the query."""
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        self._serve(lambda: self._send_json(200, {"organic_results": self._results(query)}))
+
+    @staticmethod
+    def _results(query: str) -> list:
+        words = query.split()
+        results = []
+        for rank in range(10):
+            # Alternate on-topic and off-topic snippets so reranking has work to do.
+            if rank % 2 == 0:
+                snippet = f"Reporting on the claim that {query.rstrip('.')}; experts weighed in on {' '.join(words[:4])}."
+            else:
+                snippet = "Sign in to your account to manage subscriptions and newsletter preferences."
+            results.append({
+                "link": f"https://source{rank}.example.com/{hashlib.sha256(query.encode('utf-8')).hexdigest()[:8]}/{rank}",
+                "source": f"source{rank % 7}.example.com",
+                "date": "2024-05-15",
+                "snippet": snippet,
+            })
+        return results
+
+class OcrSpaceHandler(_Handler):
+    """POST /parse/image returning a fixed screenshot transcript."""
+    TEXT = (
+        "The city council approved a 12 percent budget increase on March 3, 2024. "
+        "The new bridge will cost 450 million dollars and open in 2027."
+    )
+
+    def do_POST(self):
+        self._read_body()
+        self._serve(lambda: self._send_json(200, {"IsErroredOnProcessing": False, "ParsedResults": [{"ParsedText": self.TEXT}]}))
+
+def start_openai(behavior: Behavior) -> _MockServer:
+    return _MockServer(OpenAIHandler, behavior).start()
+
+def start_serpapi(behavior: Behavior) -> _MockServer:
+    return _MockServer(SerpApiHandler, behavior).start()
+
+def start_ocr_space(behavior: Behavior) -> _MockServer:
+    return _MockServer(OcrSpaceHandler, behavior).start()
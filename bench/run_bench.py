@@ -0,0 +1,179 @@
+"""End-to-end pipeline benchmark against local stand-in servers.
+
+Usage: python bench/run_bench.py [--items N] [--concurrency N] [--output report.json]
+                                 [--baseline baseline.json [--tolerance 0.25]] [--save-baseline baseline.json]
+
+Starts mock OpenAI, SerpAPI and OCR.space servers, points the real pipeline at
+them and drives what the app runs per item, extract_claims ->
+pipeline.verify_claims (claim index, retrieval, reranking, adaptive stance,
+scoring) -> generate_credibility_card, over a fixed workload with cold caches.
+The claim index lives in the temporary cache directory, so repeated claims in
+the workload are reused just as they would be in the app. Reports throughput,
+p50/p95/p99 latency, per-stage timings, call and token counts and cache hit
+rates. With --baseline, exits non-zero if latency, throughput or calls per item
+regress beyond the tolerance.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_servers
+
+SUBJECTS = ["The FusionX phone", "The city council", "A new vaccine", "The central bank", "The national park", "A local school"]
+FACTS = [
+    "was released on May 15, 2024 after three years of development.",
+    "runs for up to 500 hours on a single charge according to its maker.",
+    "approved a 12 percent increase in public transit funding last year.",
+    "reduced hospital admissions by 40 percent in a trial of 3,000 people.",
+    "raised its benchmark interest rate to 5.25 percent in July 2023.",
+    "received more than 2 million visitors during the summer season.",
+]
+
+def build_workload(items: int) -> list:
+    """Deterministic mix of text items, with every fifth item a screenshot."""
+    workload = []
+    for i in range(items):
+        if i % 5 == 4:
+            workload.append({"image": f"screenshot-{i}".encode("utf-8")})
+            continue
+        sentences = [f"{SUBJECTS[(i + k) % len(SUBJECTS)]} {FACTS[(i * 2 + k) % len(FACTS)]}" for k in range(3 + i % 3)]
+        workload.append({"text": " ".join(sentences)})
+    return workload
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+def configure_environment(servers: dict, cache_dir: str) -> None:
+    """Points every external client at the mock servers; must run before pipeline imports."""
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": servers["openai"].url + "/v1",
+        "SERPAPI_API_KEY": "bench",
+        "SERPAPI_BASE_URL": servers["serpapi"].url,
+        "OCR_SPACE_API_KEY": "bench",
+        "OCR_SPACE_URL": servers["ocr_space"].url + "/parse/image",
+        "OCR_BACKEND": "remote",
+        "CLAIM_VERIFIER_CACHE_DIR": cache_dir,
+        "LLM_BACKOFF_BASE_SECONDS": "0.05",
+    })
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "100000")
+    os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "100000000")
+
+def run(args) -> dict:
+    servers = {
+        "openai": mock_servers.start_openai(mock_servers.Behavior(args.openai_ms, args.sigma, args.error_rate, args.rate_limit_rate)),
+        "serpapi": mock_servers.start_serpapi(mock_servers.Behavior(args.serpapi_ms, args.sigma, args.error_rate)),
+        "ocr_space": mock_servers.start_ocr_space(mock_servers.Behavior(args.ocr_ms, args.sigma, args.error_rate)),
+    }
+    cache_dir = tempfile.mkdtemp(prefix="claim-verifier-bench-")
+    configure_environment(servers, cache_dir)
+
+    import claims
+    import explain
+    import io_utils
+    import metrics
+    import pipeline
+
+    def verify_item(item: dict) -> dict:
+        started = time.perf_counter()
+        text = io_utils.extract_text_from_image(item["image"]) if "image" in item else item["text"]
+        extracted = claims.extract_claims(text)
+        judgments, assessments = {}, {}
+        for c, _, claim_judgments, assessment in pipeline.verify_claims(extracted):
+            judgments[c.id] = claim_judgments
+            assessments[c.id] = assessment
+        explain.generate_credibility_card(extracted, judgments, assessments)
+        return {"latency": time.perf_counter() - started, "claims": len(extracted)}
+
+    workload = build_workload(args.items)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(verify_item, workload))
+    elapsed = time.perf_counter() - started
+
+    for server in servers.values():
+        server.stop()
+
+    latencies = [r["latency"] for r in results]
+    total_claims = sum(r["claims"] for r in results)
+    summary = metrics.summary()
+    return {
+        "config": vars(args),
+        "items": len(workload),
+        "claims": total_claims,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_items_per_second": round(len(workload) / elapsed, 3),
+        "throughput_claims_per_second": round(total_claims / elapsed, 3),
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 0.50), 4),
+            "p95": round(percentile(latencies, 0.95), 4),
+            "p99": round(percentile(latencies, 0.99), 4),
+        },
+        "server_requests": {name: dict(server.counts) for name, server in servers.items()},
+        "calls_per_item": round(sum(sum(s.counts.values()) for s in servers.values()) / max(1, len(workload)), 3),
+        "llm_tokens": summary["llm_tokens"],
+        "tokens_per_claim": round(sum(summary["llm_tokens"].values()) / total_claims, 1) if total_claims else 0.0,
+        "caches": summary["caches"],
+        "stages": summary["stages"],
+    }
+
+def check_regression(report: dict, baseline: dict, tolerance: float) -> list:
+    """Returns human-readable regressions of `report` against `baseline`."""
+    failures = []
+    for q in ("p50", "p95", "p99"):
+        limit = baseline["latency_seconds"][q] * (1 + tolerance)
+        if report["latency_seconds"][q] > limit:
+            failures.append(f"{q} latency {report['latency_seconds'][q]:.3f}s exceeds {limit:.3f}s")
+    floor = baseline["throughput_items_per_second"] * (1 - tolerance)
+    if report["throughput_items_per_second"] < floor:
+        failures.append(f"throughput {report['throughput_items_per_second']:.3f}/s below {floor:.3f}/s")
+    ceiling = baseline["calls_per_item"] * (1 + tolerance)
+    if report["calls_per_item"] > ceiling:
+        failures.append(f"calls per item {report['calls_per_item']:.2f} exceeds {ceiling:.2f}")
+    return failures
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the verification pipeline against local mock APIs.")
+    parser.add_argument("--items", type=int, default=20, help="Workload size.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Items processed concurrently.")
+    parser.add_argument("--openai-ms", type=float, default=300.0, help="Median OpenAI latency.")
+    parser.add_argument("--serpapi-ms", type=float, default=600.0, help="Median SerpAPI latency.")
+    parser.add_argument("--ocr-ms", type=float, default=800.0, help="Median OCR.space latency.")
+    parser.add_argument("--sigma", type=float, default=0.4, help="Log-normal latency spread.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of OpenAI requests answered with a 429.")
+    parser.add_argument("--output", help="Write the JSON report here.")
+    parser.add_argument("--baseline", help="Compare against a previously saved report.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression against the baseline.")
+    parser.add_argument("--save-baseline", help="Save this run's report as a baseline.")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            failures = check_regression(report, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION: {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Cold-start import benchmark for the Streamlit app.
+
+Usage: python bench/startup.py [--runs N] [--output report.json]
+                               [--baseline baseline.json [--tolerance 0.25]] [--save-baseline baseline.json]
+
+Imports the modules app.py loads at start-up in fresh interpreters under
+`python -X importtime`, and reports the median import time, peak resident
+memory and the slowest top-level imports. Exits non-zero if any heavy
+dependency that should only load on first use (OpenAI, ReportLab, trafilatura,
+SerpAPI, Pillow, Tesseract, NumPy) is imported at start-up, or, with --baseline, if
+import time or memory regress beyond the tolerance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What app.py imports before the first user interaction.
+APP_MODULES = ["dotenv", "io_utils", "claims", "explain", "metrics", "pipeline", "ui_components"]
+# Packages that must not load until the user clicks Analyze or Download.
+LAZY_PACKAGES = ["openai", "reportlab", "trafilatura", "serpapi", "PIL", "pytesseract", "numpy"]
+
+PROBE = """
+import resource, sys
+import {modules}
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+print(",".join(sorted({{name.split(".")[0] for name in sys.modules}})))
+"""
+
+def parse_importtime(stderr: str) -> list:
+    """Parses `-X importtime` output into (module, self_us, cumulative_us, depth) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def measure_once(modules: list) -> dict:
+    """Imports `modules` in a fresh interpreter and returns its timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(modules=", ".join(modules))],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import probe failed: {errors[-1] if errors else result.returncode}")
+    max_rss_kb, loaded = result.stdout.strip().splitlines()[-2:]
+    rows = parse_importtime(result.stderr)
+    top_level = [row for row in rows if row[3] == 0]
+    return {
+        "import_seconds": sum(row[2] for row in top_level) / 1e6,
+        "max_rss_mb": int(max_rss_kb) / 1024,
+        "top_imports": sorted(top_level, key=lambda row: -row[2]),
+        "loaded": set(loaded.split(",")),
+    }
+
+def run(args) -> dict:
+    samples = [measure_once(APP_MODULES) for _ in range(args.runs)]
+    median = min(samples, key=lambda s: abs(s["import_seconds"] - statistics.median(x["import_seconds"] for x in samples)))
+    return {
+        "modules": APP_MODULES,
+        "runs": args.runs,
+        "import_seconds": round(statistics.median(s["import_seconds"] for s in samples), 4),
+        "max_rss_mb": round(statistics.median(s["max_rss_mb"] for s in samples), 1),
+        "top_imports": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1), "self_ms": round(self_us / 1000, 1)}
+            for name, self_us, cumulative, _ in median["top_imports"][:args.top]
+        ],
+        "eager_heavy_imports": sorted(p for p in LAZY_PACKAGES if p in median["loaded"]),
+    }
+
+def check_regression(report: dict, baseline: dict, tolerance: float) -> list:
+    """Returns human-readable regressions of `report` against `baseline`."""
+    failures = []
+    for key, unit in (("import_seconds", "s"), ("max_rss_mb", " MB")):
+        limit = baseline[key] * (1 + tolerance)
+        if report[key] > limit:
+            failures.append(f"{key} {report[key]:.3f}{unit} exceeds {limit:.3f}{unit}")
+    return failures
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the app's cold-start import cost.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample; the median is reported.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list.")
+    parser.add_argument("--output", help="Write the JSON report here.")
+    parser.add_argument("--baseline", help="Compare against a previously saved report.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression against the baseline.")
+    parser.add_argument("--save-baseline", help="Save this run's report as a baseline.")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    failures = [f"{name} is imported at start-up" for name in report["eager_heavy_imports"]]
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            failures += check_regression(report, json.load(f), args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
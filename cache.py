@@ -0,0 +1,197 @@
+from typing import Any, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.environ.get("CLAIM_VERIFIER_CACHE_DIR", ".cache")
+CACHE_DB = os.path.join(CACHE_DIR, "claim_verifier.sqlite")
+
+def make_key(*parts: Any) -> str:
+    """Builds a stable cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def normalize_query(text: str) -> str:
+    """Normalizes free text so trivially different queries share a cache entry."""
+    return " ".join((text or "").lower().split())
+
+class SQLiteCache:
+    """Persistent key/value cache with TTL expiry and size-bounded LRU eviction.
+
+    Entries are pickled, so any object the pipeline produces can be stored as-is.
+    Several namespaces can share one database file.
+    """
+    def __init__(self, namespace: str, path: str = CACHE_DB, ttl_seconds: Optional[float] = None, max_entries: int = 10000):
+        self.namespace = namespace
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            self._conn.commit()
+        try:
+            return pickle.loads(value)
+        except Exception:
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Stores a value, evicting the least recently used entries when full."""
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, sqlite3.Binary(blob), now, now),
+            )
+            self._conn.execute(
+                """DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Removes every entry in this namespace."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+class ResponseCache:
+    """Two-tier cache: an in-process LRU in front of an optional SQLiteCache.
+
+    Memory entries are evicted by count and age; the disk tier applies its own
+    TTL and size limits. Hit and miss counters are kept per tier.
+    """
+    def __init__(self, disk: Optional[SQLiteCache] = None, max_memory_entries: int = 1024, max_age_seconds: Optional[float] = None):
+        self.disk = disk
+        self.max_memory_entries = max_memory_entries
+        self.max_age_seconds = max_age_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.max_age_seconds is None or now - stored_at <= self.max_age_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+        value = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value, now)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value, time.time())
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def _remember(self, key: str, value: Any, now: float) -> None:
+        self._memory[key] = (now, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def warm_from_file(self, path: str) -> int:
+        """Loads `{"key": ..., "value": ...}` JSON lines into the cache.
+
+        Returns the number of entries loaded; malformed lines are skipped.
+        """
+        loaded = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self.set(record["key"], record["value"])
+                    loaded += 1
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return loaded
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
@@ -0,0 +1,218 @@
+from typing import Dict, List, Optional, Set, Tuple
+from search_retrieval import Evidence
+from stance import StanceJudgment
+from scoring import RiskAssessment
+from cache import CACHE_DIR
+from text_utils import STOPWORDS, numbers
+import bisect
+import copy
+import hashlib
+import os
+import pickle
+import random
+import re
+import threading
+import time
+
+SIMILARITY_THRESHOLD = float(os.environ.get("CLAIM_INDEX_THRESHOLD", "0.7"))
+MAX_AGE_SECONDS = float(os.environ.get("CLAIM_INDEX_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+# Records are pickled model objects; bump the version whenever their layout
+# changes (as with the switch to slotted dataclasses) so old logs aren't misread.
+INDEX_LOG = os.path.join(CACHE_DIR, "claim_index.v2.log")
+
+# 16 bands of 4 rows finds ~99% of pairs at Jaccard 0.7 and few below 0.3.
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Words that flip a claim's meaning while barely changing its shingles; a match
+# must agree on all of them, as well as on every number.
+NEGATIONS = {"not", "no", "never", "none", "nor", "neither", "without", "nobody", "nothing"}
+INCREASE_WORDS = {
+    "increase", "increased", "increases", "increasing", "rise", "rises", "rose", "risen", "rising",
+    "grow", "grows", "grew", "grown", "growing", "raise", "raised", "raises", "gain", "gained", "gains",
+    "boost", "boosted", "boosts", "higher", "more", "up",
+}
+DECREASE_WORDS = {
+    "decrease", "decreased", "decreases", "decreasing", "reduce", "reduced", "reduces", "reducing",
+    "fall", "falls", "fell", "fallen", "falling", "drop", "dropped", "drops", "decline", "declined",
+    "declines", "cut", "cuts", "lower", "lowered", "less", "down", "shrink", "shrank", "shrunk",
+}
+
+def polarity_key(text: str) -> Tuple[frozenset, frozenset, frozenset]:
+    """Negations, numbers and increase/decrease words of a claim, which a near-duplicate must share."""
+    lowered = re.sub(r"n't\b", " not", text.lower()).replace("cannot", "can not")
+    words = set(re.findall(r"\w+", lowered))
+    directions = frozenset(
+        direction for direction, vocabulary in (("increase", INCREASE_WORDS), ("decrease", DECREASE_WORDS))
+        if words & vocabulary
+    )
+    return frozenset(words & NEGATIONS), frozenset(numbers(text)), directions
+
+def shingles(text: str) -> Set[int]:
+    """Hashed word unigrams and bigrams of a claim, ignoring case and stopwords."""
+    words = [w for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS]
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big") for g in grams}
+
+def minhash(shingle_set: Set[int]) -> List[int]:
+    """MinHash signature of a shingle set."""
+    if not shingle_set:
+        return [_PRIME] * NUM_PERM
+    return [min((a * h + b) % _PRIME for h in shingle_set) for a, b in _PERMUTATIONS]
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class IndexedVerdict:
+    """A previously verified claim and the results produced for it."""
+    def __init__(self, text: str, evidence: List[Evidence], judgments: List[StanceJudgment], assessment: RiskAssessment, verified_at: float):
+        self.text = text
+        self.evidence = evidence
+        self.judgments = judgments
+        self.assessment = assessment
+        self.verified_at = verified_at
+
+class ClaimIndex:
+    """MinHash/LSH index over verified claim texts for near-duplicate lookup.
+
+    Candidates from the LSH buckets are confirmed with exact Jaccard similarity,
+    so the threshold applies to real similarity rather than the estimate. When
+    `log_path` is set, inserts are appended to it and replayed on start-up.
+    Expired verdicts are dropped on replay and whenever they make up half of
+    the index; the log is then rewritten without them.
+    """
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_age_seconds: float = MAX_AGE_SECONDS, log_path: Optional[str] = None):
+        self.threshold = threshold
+        self.max_age_seconds = max_age_seconds
+        self.log_path = log_path
+        self._entries: List[Tuple[Set[int], tuple, IndexedVerdict]] = []
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(NUM_BANDS)]
+        self._lock = threading.Lock()
+        if log_path and os.path.exists(log_path):
+            self._replay(log_path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, signature: List[int]) -> List[int]:
+        return [
+            hash(tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]))
+            for band in range(NUM_BANDS)
+        ]
+
+    def _add(self, shingle_set: Set[int], verdict: IndexedVerdict) -> None:
+        entry_id = len(self._entries)
+        self._entries.append((shingle_set, polarity_key(verdict.text), verdict))
+        for band, key in enumerate(self._band_keys(minhash(shingle_set))):
+            self._buckets[band].setdefault(key, []).append(entry_id)
+
+    def _expired_count(self, now: float) -> int:
+        # Entries are kept in insertion order, so the expired ones form a prefix.
+        return bisect.bisect_left(self._entries, now - self.max_age_seconds, key=lambda entry: entry[2].verified_at)
+
+    def _rebuild(self, verdicts: List[IndexedVerdict]) -> None:
+        self._entries = []
+        self._buckets = [{} for _ in range(NUM_BANDS)]
+        for verdict in verdicts:
+            self._add(shingles(verdict.text), verdict)
+
+    def _rewrite_log(self) -> None:
+        """Replaces the log with the live entries (caller holds the lock)."""
+        tmp_path = f"{self.log_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            for _, _, verdict in self._entries:
+                pickle.dump(verdict, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.log_path)
+
+    def _replay(self, path: str) -> None:
+        verdicts, dirty = [], False
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    verdicts.append(pickle.load(f))
+                except EOFError:
+                    break
+                except Exception:
+                    # A torn final record from an interrupted write; keep what we have.
+                    dirty = True
+                    break
+        cutoff = time.time() - self.max_age_seconds
+        # Several processes may append to one log, so restore time order.
+        live = sorted((v for v in verdicts if v.verified_at >= cutoff), key=lambda v: v.verified_at)
+        self._rebuild(live)
+        if dirty or len(live) < len(verdicts):
+            self._rewrite_log()
+
+    def insert(self, text: str, evidence: List[Evidence], judgments: List[StanceJudgment], assessment: RiskAssessment) -> None:
+        """Adds a verified claim to the index."""
+        verdict = IndexedVerdict(text, evidence, judgments, assessment, time.time())
+        shingle_set = shingles(text)
+        with self._lock:
+            self._add(shingle_set, verdict)
+            expired = self._expired_count(verdict.verified_at)
+            if expired and 2 * expired >= len(self._entries):
+                self._rebuild([v for _, _, v in self._entries[expired:]])
+                if self.log_path:
+                    self._rewrite_log()
+            elif self.log_path:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "ab") as f:
+                    pickle.dump(verdict, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def lookup(self, text: str) -> Optional[Tuple[IndexedVerdict, float]]:
+        """Returns the most similar fresh verdict and its similarity, or None.
+
+        Only verdicts whose claim has the same negations, numbers and
+        increase/decrease words are considered.
+        """
+        shingle_set = shingles(text)
+        if not shingle_set:
+            return None
+        polarity = polarity_key(text)
+        now = time.time()
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(minhash(shingle_set))):
+                candidates.update(self._buckets[band].get(key, ()))
+            best, best_score = None, 0.0
+            for entry_id in candidates:
+                entry_shingles, entry_key, verdict = self._entries[entry_id]
+                if entry_key != polarity:
+                    continue
+                if now - verdict.verified_at > self.max_age_seconds:
+                    continue
+                score = jaccard(shingle_set, entry_shingles)
+                if score < self.threshold:
+                    continue
+                # Prefer the most similar claim, and the most recent one on ties.
+                if best is None or (score, verdict.verified_at) > (best_score, best.verified_at):
+                    best, best_score = verdict, score
+        return (best, best_score) if best is not None else None
+
+def reuse_verdict(verdict: IndexedVerdict, claim_id: str) -> Tuple[List[Evidence], List[StanceJudgment], RiskAssessment]:
+    """Copies a prior verdict's results, re-keyed to a new claim."""
+    judgments = []
+    for j in verdict.judgments:
+        j = copy.copy(j)
+        j.claim_id = claim_id
+        judgments.append(j)
+    assessment = copy.copy(verdict.assessment)
+    assessment.claim_id = claim_id
+    return list(verdict.evidence), judgments, assessment
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+def get_claim_index() -> ClaimIndex:
+    """Returns the process-wide claim index, persisted under the cache directory."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = ClaimIndex(log_path=INDEX_LOG)
+        return _default_index
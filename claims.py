@@ -1,20 +1,123 @@
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from text_utils import estimate_tokens
+import re
 import uuid
-import openai
+import llm
+import metrics
 import os
 
+# Inputs longer than this are split into overlapping chunks extracted in parallel.
+MAX_CHUNK_TOKENS = int(os.environ.get("CLAIMS_MAX_CHUNK_TOKENS", "2000"))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CLAIMS_CHUNK_OVERLAP_TOKENS", "150"))
+MAX_CONCURRENT_CHUNKS = int(os.environ.get("CLAIMS_MAX_CONCURRENCY", "4"))
+# Claims from overlapping chunks this similar are treated as the same claim.
+DUPLICATE_SIMILARITY = 0.85
+
+@dataclass(slots=True)
 class Claim:
     """Data schema for a claim."""
-    def __init__(self, text: str):
-        self.id = str(uuid.uuid4())
-        self.text = text
-        self.entities = []  # Placeholder for entity extraction
-        self.time_context = "" # Placeholder for time context
+    text: str
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    entities: list = field(default_factory=list)  # Placeholder for entity extraction
+    time_context: str = "" # Placeholder for time context
+
+def _split_units(text: str, max_tokens: int) -> List[str]:
+    """Splits text into paragraphs, then sentences, then word runs, each within `max_tokens`."""
+    units = []
+    for paragraph in re.split(r"\n\s*\n|\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                units.append(sentence)
+                continue
+            words, current = sentence.split(), []
+            for word in words:
+                if current and estimate_tokens(" ".join(current + [word])) > max_tokens:
+                    units.append(" ".join(current))
+                    current = []
+                current.append(word)
+            if current:
+                units.append(" ".join(current))
+    return units
+
+def _trailing_sentences(unit: str, max_tokens: int) -> str:
+    """The longest run of `unit`'s final sentences that fits in `max_tokens`."""
+    tail, used = [], 0
+    for sentence in reversed(re.split(r"(?<=[.!?])\s+", unit)):
+        cost = estimate_tokens(sentence)
+        if used + cost > max_tokens:
+            break
+        tail.insert(0, sentence)
+        used += cost
+    return " ".join(tail)
+
+def chunk_text(text: str, max_tokens: int = MAX_CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    """Splits text on paragraph/sentence boundaries into chunks of at most `max_tokens`.
+
+    Each chunk starts with the trailing units of the previous one, up to
+    `overlap_tokens`, so claims straddling a boundary are seen whole. A unit
+    too long to carry over whole contributes its trailing sentences instead.
+    """
+    chunks, current, used = [], [], 0
+    for unit in _split_units(text, max_tokens):
+        cost = estimate_tokens(unit)
+        if current and used + cost > max_tokens:
+            chunks.append("\n".join(current))
+            overlap, overlap_used = [], 0
+            for previous in reversed(current):
+                previous_cost = estimate_tokens(previous)
+                budget = min(overlap_tokens, max_tokens - cost) - overlap_used
+                if previous_cost > budget:
+                    tail = _trailing_sentences(previous, budget)
+                    if tail:
+                        overlap.insert(0, tail)
+                        overlap_used += estimate_tokens(tail)
+                    break
+                overlap.insert(0, previous)
+                overlap_used += previous_cost
+            current, used = overlap, overlap_used
+        current.append(unit)
+        used += cost
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
 
-def extract_claims(text: str) -> List[Claim]:
-    """Uses an LLM to extract factual claims from the provided text."""
-    client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+def _claim_terms(text: str) -> set:
+    return set(re.findall(r"\w+", text.lower()))
 
+def _dedupe_claims(claim_texts: List[str]) -> List[str]:
+    """Drops exact and near-duplicate claims, keeping the first occurrence."""
+    kept, kept_terms = [], []
+    for text in claim_texts:
+        terms = _claim_terms(text)
+        if not terms:
+            continue
+        if any(len(terms & other) / len(terms | other) >= DUPLICATE_SIMILARITY for other in kept_terms):
+            continue
+        kept.append(text)
+        kept_terms.append(terms)
+    return kept
+
+def _parse_claim_list(response_text: str) -> List[str]:
+    """Parses the model's Python list of claims, tolerating a Markdown code fence."""
+    # A simple way to parse the list from the LLM output.
+    # This can be made more robust with Pydantic for schema enforcement.
+    import ast
+    response_text = re.sub(r"^```\w*\s*|\s*```$", "", response_text.strip())
+    claims_list = ast.literal_eval(response_text)
+    if not isinstance(claims_list, (list, tuple)):
+        raise ValueError(f"expected a list of claims, got {type(claims_list).__name__}")
+    return [str(c) for c in claims_list]
+
+def _extract_claim_texts(text: str, raise_errors: bool = False) -> List[str]:
+    """Extracts claim strings from one piece of text; returns [] on any error unless `raise_errors`."""
     prompt = f"""
     You are an expert fact-checker. Your task is to extract clear, verifiable factual claims from the following text.
     Identify claims that can be proven or disproven with external evidence.
@@ -32,18 +135,38 @@ def extract_claims(text: str) -> List[Claim]:
     """
     
     try:
-        response = client.chat.completions.create(
+        response_text = llm.chat_completion(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
+            validate=_parse_claim_list,
         )
-        response_text = response.choices[0].message.content.strip()
-        
-        # A simple way to parse the list from the LLM output.
-        # This can be made more robust with Pydantic for schema enforcement.
-        import ast
-        claims_list = ast.literal_eval(response_text)
-        return [Claim(c) for c in claims_list]
+        return _parse_claim_list(response_text)
     except Exception as e:
         # st.error(f"Error extracting claims: {e}")
-        return []
\ No newline at end of file
+        if raise_errors:
+            raise
+        return []
+
+@metrics.timed("extract_claims")
+def extract_claims(
+    text: str,
+    max_chunk_tokens: int = MAX_CHUNK_TOKENS,
+    max_concurrency: int = MAX_CONCURRENT_CHUNKS,
+    raise_errors: bool = False,
+) -> List[Claim]:
+    """Uses an LLM to extract factual claims from the provided text.
+
+    Text longer than `max_chunk_tokens` is split into overlapping chunks that
+    are extracted concurrently; claims repeated across chunks are merged.
+    A failed request or unparseable reply yields no claims for that text, or
+    is raised when `raise_errors` is set so callers can tell it from "no claims".
+    """
+    extract = lambda chunk: _extract_claim_texts(chunk, raise_errors)
+    if estimate_tokens(text) <= max_chunk_tokens:
+        return [Claim(c) for c in extract(text)]
+
+    chunks = chunk_text(text, max_chunk_tokens)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(chunks)))) as executor:
+        per_chunk = list(executor.map(metrics.bind_trace(extract), chunks))
+    return [Claim(c) for c in _dedupe_claims([c for chunk_claims in per_chunk for c in chunk_claims])]
@@ -1,14 +1,27 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Flowable
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.enums import TA_CENTER
-from reportlab.lib.units import inch
-from typing import List
+from typing import TYPE_CHECKING, List
+from collections import OrderedDict
+from dataclasses import astuple
+from functools import lru_cache
 from claims import Claim
 from stance import StanceJudgment
 from scoring import RiskAssessment
+import metrics
 import datetime
+import hashlib
 import io
+import pickle
+import threading
+
+# ReportLab is only needed once a card is actually rendered, so it is
+# imported inside the rendering functions rather than at module load.
+if TYPE_CHECKING:
+    from reportlab.lib.styles import StyleSheet1
+
+# Rendered cards kept in memory, keyed by a hash of their content.
+CARD_CACHE_SIZE = 16
+
+_card_cache = OrderedDict()
+_card_cache_lock = threading.Lock()
 
 # Dummy data for lessons
 LESSONS = {
@@ -25,34 +38,96 @@ LESSONS = {
     # Add other lessons as needed
 }
 
-class Line(Flowable):
-    def __init__(self, width=1*inch, color=(0, 0, 0)):
-        Flowable.__init__(self)
-        self.width = width
-        self.strokeColor = color
+@lru_cache(maxsize=1)
+def _line_class() -> type:
+    """Defines the horizontal-rule Flowable on first use."""
+    from reportlab.platypus import Flowable
+    from reportlab.lib.units import inch
+
+    class Line(Flowable):
+        def __init__(self, width=1*inch, color=(0, 0, 0)):
+            Flowable.__init__(self)
+            self.width = width
+            self.strokeColor = color
+
+        def draw(self):
+            self.canv.line(0, self.height, self.width, self.height)
 
-    def draw(self):
-        self.canv.line(0, self.height, self.width, self.height)
+    return Line
 
 def get_micro_lesson(topic: str) -> str:
     """Returns the text for a micro-lesson."""
     return LESSONS.get(topic, "No lesson found for this topic.")
 
+@lru_cache(maxsize=1)
+def _styles() -> "StyleSheet1":
+    """Builds the card stylesheet once; ReportLab styles are read-only during rendering."""
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.enums import TA_CENTER
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle("CardTitle", parent=styles["h1"], alignment=TA_CENTER))
+    return styles
+
+def card_fingerprint(claims: List[Claim], judgments: dict, assessments: dict) -> str:
+    """Hash of everything a credibility card renders, used to memoize it."""
+    digest = hashlib.sha256()
+    for claim in claims:
+        assessment = assessments.get(claim.id)
+        content = (
+            claim.id,
+            claim.text,
+            [astuple(j) for j in judgments.get(claim.id, [])],
+            astuple(assessment) if assessment else None,
+        )
+        digest.update(pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+@metrics.timed("credibility_card")
 def generate_credibility_card(
     claims: List[Claim],
     judgments: dict,
     assessments: dict
 ) -> bytes:
-    """Generates a PDF credibility card with a summary of the analysis."""
+    """Generates a PDF credibility card with a summary of the analysis.
+
+    Cards are memoized on a content hash, so asking again for unchanged
+    results returns the previously rendered PDF.
+    """
+    key = card_fingerprint(claims, judgments, assessments)
+    with _card_cache_lock:
+        hit = key in _card_cache
+        if hit:
+            _card_cache.move_to_end(key)
+            pdf = _card_cache[key]
+    metrics.record_cache("credibility_card", hit)
+    if hit:
+        return pdf
+
+    pdf = _render_credibility_card(claims, judgments, assessments)
+    with _card_cache_lock:
+        _card_cache[key] = pdf
+        while len(_card_cache) > CARD_CACHE_SIZE:
+            _card_cache.popitem(last=False)
+    return pdf
+
+def _render_credibility_card(
+    claims: List[Claim],
+    judgments: dict,
+    assessments: dict
+) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.units import inch
+
+    Line = _line_class()
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     story = []
-    styles = getSampleStyleSheet()
+    styles = _styles()
 
     # Title
-    title_style = styles["h1"]
-    title_style.alignment = TA_CENTER
-    story.append(Paragraph("Credibility Card", title_style))
+    story.append(Paragraph("Credibility Card", styles["CardTitle"]))
     story.append(Spacer(1, 0.2 * inch))
     
     # Timestamp
@@ -93,6 +168,6 @@ def generate_credibility_card(
         story.append(Line(doc.width))
         story.append(Spacer(1, 0.2 * inch))
 
+    # build() consumes the story as it lays out each flowable.
     doc.build(story)
-    buffer.seek(0)
     return buffer.getvalue()
\ No newline at end of file
@@ -1,37 +1,273 @@
-import requests
-import trafilatura
-from PIL import Image
-import pytesseract
 import os
+import threading
+import hashlib
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, List, Optional
+from urllib.parse import urlparse
+from cache import SQLiteCache, make_key
+import metrics
+
+# requests, trafilatura, Pillow and pytesseract are imported where they are
+# used, so importing this module (e.g. at app start-up) stays cheap.
+if TYPE_CHECKING:
+    import requests
+    from PIL import Image
+
+FETCH_CONNECT_TIMEOUT = float(os.environ.get("FETCH_CONNECT_TIMEOUT_SECONDS", "5"))
+FETCH_READ_TIMEOUT = float(os.environ.get("FETCH_READ_TIMEOUT_SECONDS", "20"))
+# Larger bodies are truncated; articles rarely need more than a few MB of HTML.
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+FETCH_MAX_PER_HOST = int(os.environ.get("FETCH_MAX_PER_HOST", "4"))
+FETCH_MAX_CONCURRENCY = int(os.environ.get("FETCH_MAX_CONCURRENCY", "16"))
+PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", "5000"))
+USER_AGENT = "Mozilla/5.0 (compatible; claim-verifier/1.0)"
+# One of "local" (Tesseract), "remote" (OCR.space) or "auto" (local first, remote fallback).
+OCR_BACKEND = os.environ.get("OCR_BACKEND", "auto")
+OCR_MAX_PROCESSES = int(os.environ.get("OCR_MAX_PROCESSES", str(os.cpu_count() or 2)))
+# Screenshots are downscaled to this longest side before recognition.
+OCR_MAX_DIMENSION = int(os.environ.get("OCR_MAX_DIMENSION", "2000"))
+OCR_TIMEOUT_SECONDS = float(os.environ.get("OCR_TIMEOUT_SECONDS", "60"))
+OCR_CACHE_MAX_ENTRIES = int(os.environ.get("OCR_CACHE_MAX_ENTRIES", "5000"))
+OCR_SPACE_URL = os.environ.get("OCR_SPACE_URL", "https://api.ocr.space/parse/image")
+
+# Messages fetch_url_content returns in place of article text.
+FETCH_FAILED_MESSAGE = "Could not fetch content."
+FETCH_ERROR_PREFIX = "Error fetching URL: "
+
+_session = None
+_page_cache = None
+_ocr_cache = None
+_ocr_pool = None
+_host_slots = {}
+_shared_lock = threading.Lock()
+
+def get_session() -> "requests.Session":
+    """Returns the shared keep-alive HTTP session used for all outbound requests."""
+    global _session
+    with _shared_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=FETCH_MAX_PER_HOST)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+def get_page_cache() -> SQLiteCache:
+    """Cache of extracted article text with the validators needed to revalidate it."""
+    global _page_cache
+    with _shared_lock:
+        if _page_cache is None:
+            _page_cache = SQLiteCache("pages", max_entries=PAGE_CACHE_MAX_ENTRIES)
+        return _page_cache
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc
+    with _shared_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(FETCH_MAX_PER_HOST)
+        return _host_slots[host]
+
+def _read_capped(response: "requests.Response", max_bytes: int = FETCH_MAX_BYTES) -> bytes:
+    """Reads a streamed response body, stopping after `max_bytes`."""
+    chunks, size = [], 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            break
+    return b"".join(chunks)[:max_bytes]
+
+@metrics.timed("fetch")
+def fetch_url_content(url: str, use_cache: bool = True) -> str:
+    """Fetches text content from a given URL.
+
+    Pages served with an ETag or Last-Modified header are cached with their
+    extracted text and revalidated with a conditional GET, so an unchanged
+    article costs a 304 and no re-extraction.
+    """
+    cache_key = make_key("page", url)
+    cached = get_page_cache().get(cache_key) if use_cache else None
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
 
-def fetch_url_content(url: str) -> str:
-    """Fetches text content from a given URL."""
     try:
-        downloaded = trafilatura.fetch_url(url)
+        with _host_slot(url):
+            response = get_session().get(
+                url,
+                headers=headers,
+                timeout=(FETCH_CONNECT_TIMEOUT, FETCH_READ_TIMEOUT),
+                stream=True,
+            )
+            with response:
+                if use_cache:
+                    metrics.record_cache("pages", response.status_code == 304 and bool(cached))
+                if response.status_code == 304 and cached:
+                    metrics.record_call("http", "not_modified")
+                    return cached["text"]
+                if response.status_code >= 400:
+                    metrics.record_call("http", "error")
+                    return FETCH_FAILED_MESSAGE
+                metrics.record_call("http")
+                downloaded = _read_capped(response)
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
         if downloaded:
-            return trafilatura.extract(downloaded, favor_recall=True)
-        return "Could not fetch content."
+            import trafilatura
+            text = trafilatura.extract(downloaded, favor_recall=True)
+            if use_cache and text and (etag or last_modified):
+                get_page_cache().set(cache_key, {"etag": etag, "last_modified": last_modified, "text": text})
+            return text
+        return FETCH_FAILED_MESSAGE
     except Exception as e:
-        return f"Error fetching URL: {e}"
+        metrics.record_call("http", "error")
+        return f"{FETCH_ERROR_PREFIX}{e}"
+
+def fetch_failed(content: Optional[str]) -> bool:
+    """True if `content` is one of fetch_url_content's failure messages, or empty."""
+    return not content or content == FETCH_FAILED_MESSAGE or content.startswith(FETCH_ERROR_PREFIX)
+
+def fetch_many(urls: List[str], max_concurrency: int = FETCH_MAX_CONCURRENCY, use_cache: bool = True) -> List[str]:
+    """Fetches several URLs concurrently; results are in the same order as `urls`.
+
+    Requests to any single host are additionally limited to FETCH_MAX_PER_HOST.
+    """
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(urls)))) as executor:
+        return list(executor.map(metrics.bind_trace(lambda url: fetch_url_content(url, use_cache=use_cache)), urls))
+
+def get_ocr_cache() -> SQLiteCache:
+    """Cache of recognised text keyed by image content hash."""
+    global _ocr_cache
+    with _shared_lock:
+        if _ocr_cache is None:
+            _ocr_cache = SQLiteCache("ocr", max_entries=OCR_CACHE_MAX_ENTRIES)
+        return _ocr_cache
 
-def extract_text_from_image(image_bytes: bytes) -> str:
-    """Uses OCR.space API to extract text from an image."""
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    with _shared_lock:
+        if _ocr_pool is None:
+            # Forking the multi-threaded app could copy a held lock (sqlite, logging) into
+            # a worker and deadlock it, so workers start from a clean process instead.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _ocr_pool = ProcessPoolExecutor(max_workers=OCR_MAX_PROCESSES, mp_context=multiprocessing.get_context(method))
+        return _ocr_pool
+
+def preprocess_image(image_bytes: bytes, max_dimension: int = OCR_MAX_DIMENSION) -> "Image.Image":
+    """Grayscales, downscales and binarizes a screenshot for Tesseract."""
+    from PIL import Image, ImageOps
+    image = Image.open(io.BytesIO(image_bytes))
+    image = ImageOps.exif_transpose(image).convert("L")
+    if max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    image = ImageOps.autocontrast(image)
+    # Screenshots are mostly dark text on light backgrounds (or the inverse),
+    # so a global threshold at the mean separates them well.
+    histogram = image.histogram()
+    threshold = sum(i * count for i, count in enumerate(histogram)) / max(1, sum(histogram))
+    return image.point(lambda p: 255 if p > threshold else 0)
+
+def _run_tesseract(image_bytes: bytes) -> str:
+    """Process-pool worker: preprocesses an image and runs Tesseract on it."""
+    import pytesseract
+    try:
+        return pytesseract.image_to_string(preprocess_image(image_bytes), lang="eng")
+    except Exception as e:
+        # pytesseract's exceptions can't be unpickled in the parent, which would break the pool.
+        raise RuntimeError(f"Tesseract failed: {e}") from None
+
+def _ocr_local(image_bytes: bytes) -> str:
+    """Runs Tesseract in the OCR process pool; raises on failure."""
+    global _ocr_pool
+    pool = _get_ocr_pool()
+    try:
+        text = pool.submit(_run_tesseract, image_bytes).result(timeout=OCR_TIMEOUT_SECONDS)
+    except Exception as e:
+        metrics.record_call("tesseract", "error")
+        if isinstance(e, BrokenProcessPool):
+            # A worker died (e.g. killed for memory); start a fresh pool for later calls.
+            with _shared_lock:
+                if _ocr_pool is pool:
+                    _ocr_pool = None
+            pool.shutdown(wait=False)
+        raise
+    metrics.record_call("tesseract")
+    return text
+
+def _ocr_remote(image_bytes: bytes) -> str:
+    """Uses OCR.space API to extract text from an image; raises on failure."""
     api_key = os.environ.get("OCR_SPACE_API_KEY")
     if not api_key:
-        return "OCR_SPACE_API_KEY not set in .env"
+        raise RuntimeError("OCR_SPACE_API_KEY not set in .env")
 
     try:
-        response = requests.post(
-            'https://api.ocr.space/parse/image',
+        response = get_session().post(
+            OCR_SPACE_URL,
             headers={'apikey': api_key},
             files={'filename': ('image.png', image_bytes, 'image/png')},
-            data={'language': 'eng', 'isOverlayRequired': False}
+            data={'language': 'eng', 'isOverlayRequired': False},
+            timeout=(FETCH_CONNECT_TIMEOUT, 60),
         )
         data = response.json()
-        if data.get("IsErroredOnProcessing"):
-            return f"OCR Error: {data.get('ErrorMessage')}"
-        
-        parsed_text = data.get("ParsedResults", [{}])[0].get("ParsedText", "")
-        return parsed_text
     except Exception as e:
-        return f"Error with OCR API: {e}"
\ No newline at end of file
+        metrics.record_call("ocr_space", "error")
+        raise RuntimeError(f"Error with OCR API: {e}")
+    if data.get("IsErroredOnProcessing"):
+        metrics.record_call("ocr_space", "error")
+        raise RuntimeError(f"OCR Error: {data.get('ErrorMessage')}")
+    metrics.record_call("ocr_space")
+    
+    parsed_text = data.get("ParsedResults", [{}])[0].get("ParsedText", "")
+    return parsed_text
+
+@metrics.timed("ocr")
+def extract_text_from_image(image_bytes: bytes, backend: Optional[str] = None, use_cache: bool = True) -> str:
+    """Extracts text from an image with local Tesseract and/or OCR.space.
+
+    `backend` defaults to OCR_BACKEND. In "auto" mode local OCR is tried first
+    and OCR.space is used when it fails or finds no text. Successful results are
+    cached by image content hash.
+    """
+    backend = backend or OCR_BACKEND
+    cache_key = make_key("ocr", hashlib.sha256(image_bytes).hexdigest())
+    if use_cache:
+        cached = get_ocr_cache().get(cache_key)
+        metrics.record_cache("ocr", cached is not None)
+        if cached is not None:
+            return cached
+
+    attempts = {"local": [_ocr_local], "remote": [_ocr_remote], "auto": [_ocr_local, _ocr_remote]}.get(backend)
+    if attempts is None:
+        return f"Unknown OCR backend: {backend}"
+
+    error = None
+    for attempt in attempts:
+        try:
+            text = attempt(image_bytes)
+        except Exception as e:
+            error = e
+            continue
+        if text and text.strip():
+            if use_cache:
+                get_ocr_cache().set(cache_key, text)
+            return text
+    return str(error) if error else ""
+
+def extract_text_from_images(images: List[bytes], backend: Optional[str] = None) -> List[str]:
+    """OCRs a burst of images in parallel; results are in input order."""
+    if not images:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(OCR_MAX_PROCESSES, len(images)))) as executor:
+        return list(executor.map(metrics.bind_trace(lambda image: extract_text_from_image(image, backend=backend)), images))
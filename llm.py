@@ -0,0 +1,226 @@
+from typing import TYPE_CHECKING, Callable, List, Optional
+from cache import ResponseCache, SQLiteCache, make_key
+from text_utils import estimate_tokens
+import metrics
+import os
+import random
+import threading
+import time
+
+# The OpenAI SDK is imported on first request to keep start-up cheap.
+if TYPE_CHECKING:
+    import openai
+
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "2048"))
+
+# Account-level limits shared by every request this process makes.
+LLM_REQUESTS_PER_MINUTE = float(os.environ.get("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.environ.get("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE_SECONDS = float(os.environ.get("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.environ.get("LLM_BACKOFF_MAX_SECONDS", "30"))
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "60"))
+# Completion tokens reserved up front; actual usage is reconciled afterwards.
+ESTIMATED_COMPLETION_TOKENS = 300
+
+_response_cache = None
+_response_cache_configured = False
+_response_cache_lock = threading.Lock()
+_client = None
+_limiter = None
+_gateway_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Returns the process-wide LLM response cache, creating it on first use."""
+    global _response_cache, _response_cache_configured
+    with _response_cache_lock:
+        if not _response_cache_configured:
+            _response_cache_configured = True
+            disk = SQLiteCache("llm", ttl_seconds=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES)
+            _response_cache = ResponseCache(disk, max_memory_entries=LLM_CACHE_MEMORY_ENTRIES)
+            warm_file = os.environ.get("LLM_CACHE_WARM_FILE")
+            if warm_file and os.path.exists(warm_file):
+                _response_cache.warm_from_file(warm_file)
+        return _response_cache
+
+def set_response_cache(cache) -> None:
+    """Replaces the response cache; any object with get/set works, or None to disable."""
+    global _response_cache, _response_cache_configured
+    with _response_cache_lock:
+        _response_cache = cache
+        _response_cache_configured = True
+
+class TokenBucket:
+    """Continuously refilling bucket of `capacity` units per minute.
+
+    Consumption may overdraw the bucket (when actual usage exceeds an
+    estimate); the debt is repaid by refill before the next request passes.
+    """
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+class RateLimiter:
+    """Request- and token-per-minute limiter shared by every thread in the process.
+
+    A request waits while either bucket is short. Nothing is coordinated
+    across processes: a separate job such as batch.py should get its own
+    share of the account quota through LLM_REQUESTS_PER_MINUTE and
+    LLM_TOKENS_PER_MINUTE.
+    """
+    def __init__(self, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE, tokens_per_minute: float = LLM_TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int) -> None:
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if delay == 0:
+                    self.requests.level -= 1
+                    self.tokens.level -= tokens
+                    return
+                self._condition.wait(timeout=delay)
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """Adjusts the token bucket once a response reports its real usage."""
+        with self._condition:
+            self.tokens.level -= actual - estimated
+            self._condition.notify_all()
+
+def get_client() -> "openai.OpenAI":
+    """Returns the process-wide OpenAI client; its HTTP connection pool is shared by all callers."""
+    global _client
+    with _gateway_lock:
+        if _client is None:
+            import openai
+            _client = openai.OpenAI(
+                api_key=os.environ.get("OPENAI_API_KEY"),
+                timeout=LLM_TIMEOUT_SECONDS,
+                # Retries happen here, coordinated with the rate limiter.
+                max_retries=0,
+            )
+        return _client
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    with _gateway_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+def _estimate_request_tokens(messages: List[dict]) -> int:
+    return sum(estimate_tokens(m.get("content")) for m in messages) + ESTIMATED_COMPLETION_TOKENS
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Backoff before retrying `error`, or None if it should not be retried."""
+    import openai
+    if isinstance(error, openai.APIStatusError):
+        if error.status_code != 429 and error.status_code < 500:
+            return None
+        retry_after = error.response.headers.get("retry-after") if error.response is not None else None
+        if retry_after:
+            try:
+                return min(LLM_BACKOFF_MAX_SECONDS, float(retry_after))
+            except ValueError:
+                pass
+    elif not isinstance(error, openai.APIConnectionError):
+        return None
+    # Full jitter keeps concurrent retries from re-colliding.
+    return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def request_key(model: str, messages: List[dict], temperature: float, response_format: Optional[dict] = None) -> str:
+    """Content hash identifying a chat completion request."""
+    return make_key("chat", model, messages, temperature, response_format)
+
+def chat_completion(
+    model: str,
+    messages: List[dict],
+    temperature: float,
+    response_format: Optional[dict] = None,
+    use_cache: bool = True,
+    validate: Optional[Callable[[str], object]] = None,
+) -> str:
+    """Returns the message content of a chat completion, served from cache when possible.
+
+    Requests go through the shared client and rate limiter; rate-limit,
+    connection and server errors are retried with jittered exponential backoff.
+    Errors that remain propagate to the caller, and failed requests are never
+    cached. When `validate` is given, a fresh response is only cached if it
+    returns without raising; the content is returned either way so the caller
+    can handle it.
+    """
+    cache = get_response_cache() if use_cache else None
+    key = request_key(model, messages, temperature, response_format)
+    if cache is not None:
+        cached = cache.get(key)
+        metrics.record_cache("llm", cached is not None)
+        if cached is not None:
+            return cached
+
+    with metrics.span("llm_request", model=model):
+        content = _request_with_retries(model, messages, temperature, response_format)
+    if cache is not None and content is not None and _is_valid(content, validate):
+        cache.set(key, content)
+    return content
+
+def _is_valid(content: str, validate: Optional[Callable[[str], object]]) -> bool:
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except Exception:
+        return False
+    return True
+
+def _request_with_retries(
+    model: str,
+    messages: List[dict],
+    temperature: float,
+    response_format: Optional[dict],
+) -> str:
+    import openai
+    client, limiter = get_client(), get_rate_limiter()
+    estimated = _estimate_request_tokens(messages)
+    kwargs = {"response_format": response_format} if response_format else {}
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        limiter.acquire(estimated)
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                **kwargs
+            )
+        except Exception as e:
+            rate_limited = isinstance(e, openai.APIStatusError) and e.status_code == 429
+            metrics.record_call("openai", "rate_limited" if rate_limited else "error")
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == LLM_MAX_RETRIES:
+                raise
+            time.sleep(delay)
+            continue
+        metrics.record_call("openai")
+        if response.usage is not None:
+            limiter.reconcile(estimated, response.usage.total_tokens)
+            metrics.record_tokens(model, response.usage.prompt_tokens, response.usage.completion_tokens)
+        break
+
+    return response.choices[0].message.content
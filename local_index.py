@@ -0,0 +1,243 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from array import array
+from search_retrieval import Evidence
+from text_utils import STOPWORDS
+import datetime
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import threading
+
+# Passages are overlapping word windows; snippets come from the best one per document.
+PASSAGE_WORDS = 80
+PASSAGE_OVERLAP = 20
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in re.findall(r"\w+", (text or "").lower()) if w not in STOPWORDS]
+
+def split_passages(text: str, size: int = PASSAGE_WORDS, overlap: int = PASSAGE_OVERLAP) -> List[str]:
+    """Splits text into overlapping windows of roughly `size` words."""
+    words = (text or "").split()
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    step = max(1, size - overlap)
+    return [" ".join(words[start:start + size]) for start in range(0, len(words) - overlap, step)]
+
+def _mmap_file(path: str) -> Optional[mmap.mmap]:
+    if os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class _Segment:
+    """One immutable, memory-mapped slice of the index.
+
+    Files: `terms.json` maps term -> [first posting, posting count];
+    `postings.bin` holds (passage id, term frequency) uint32 pairs;
+    `lengths.bin` holds uint32 passage lengths; `offsets.bin` holds uint64
+    byte offsets of each passage record in `passages.jsonl`.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "terms.json"), "r", encoding="utf-8") as f:
+            self.terms: Dict[str, List[int]] = json.load(f)
+        self._maps = [_mmap_file(os.path.join(path, name)) for name in ("postings.bin", "lengths.bin", "offsets.bin", "passages.jsonl")]
+        postings, lengths, offsets, self._passages = self._maps
+        self.postings = memoryview(postings).cast("I") if postings else memoryview(array("I"))
+        self.lengths = memoryview(lengths).cast("I") if lengths else memoryview(array("I"))
+        self.offsets = memoryview(offsets).cast("Q") if offsets else memoryview(array("Q"))
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def passage(self, passage_id: int) -> dict:
+        start = self.offsets[passage_id]
+        end = self.offsets[passage_id + 1] if passage_id + 1 < len(self.offsets) else len(self._passages)
+        return json.loads(self._passages[start:end])
+
+    @staticmethod
+    def write(path: str, passages: List[dict]) -> int:
+        """Writes a new segment for `passages`; returns the total token count."""
+        os.makedirs(path, exist_ok=True)
+        terms: Dict[str, List[Tuple[int, int]]] = {}
+        lengths, offsets = array("I"), array("Q")
+        offset = 0
+        with open(os.path.join(path, "passages.jsonl"), "wb") as f:
+            for passage_id, passage in enumerate(passages):
+                tokens = tokenize(passage["text"])
+                lengths.append(len(tokens))
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for term, tf in counts.items():
+                    terms.setdefault(term, []).append((passage_id, tf))
+                record = (json.dumps(passage, ensure_ascii=False) + "\n").encode("utf-8")
+                offsets.append(offset)
+                offset += len(record)
+                f.write(record)
+
+        postings, directory = array("I"), {}
+        for term, entries in terms.items():
+            directory[term] = [len(postings) // 2, len(entries)]
+            for passage_id, tf in entries:
+                postings.extend((passage_id, tf))
+        for name, data in (("postings.bin", postings), ("lengths.bin", lengths), ("offsets.bin", offsets)):
+            with open(os.path.join(path, name), "wb") as f:
+                data.tofile(f)
+        with open(os.path.join(path, "terms.json"), "w", encoding="utf-8") as f:
+            json.dump(directory, f)
+        return sum(lengths)
+
+class BM25Index:
+    """On-disk BM25 inverted index over passages of reference documents.
+
+    Each call to `add_documents` writes a new segment, so the index grows
+    incrementally without rewriting existing data. Segments are memory-mapped,
+    so opening a large index is cheap and pages are loaded on demand.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, "manifest.json")
+
+    def _load(self) -> None:
+        manifest = {"segments": [], "num_passages": 0, "total_length": 0}
+        if os.path.exists(self._manifest_path()):
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        self.manifest = manifest
+        self.segments = [_Segment(os.path.join(self.path, name)) for name in manifest["segments"]]
+
+    def __len__(self) -> int:
+        return self.manifest["num_passages"]
+
+    def add_documents(self, documents: Iterable[dict]) -> int:
+        """Indexes documents with `text` and optional `url`, `domain` and `published_date`.
+
+        Returns the number of passages added.
+        """
+        passages = []
+        for doc in documents:
+            for text in split_passages(doc.get("text", "")):
+                passages.append({
+                    "url": doc.get("url", "#"),
+                    "domain": doc.get("domain", "Local"),
+                    "published_date": doc.get("published_date", "N/A"),
+                    "text": text,
+                })
+        if not passages:
+            return 0
+
+        with self._lock:
+            name = f"seg-{len(self.manifest['segments']):06d}"
+            total_length = _Segment.write(os.path.join(self.path, name), passages)
+            manifest = {
+                "segments": self.manifest["segments"] + [name],
+                "num_passages": self.manifest["num_passages"] + len(passages),
+                "total_length": self.manifest["total_length"] + total_length,
+            }
+            tmp_path = self._manifest_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, self._manifest_path())
+            self.manifest = manifest
+            self.segments.append(_Segment(os.path.join(self.path, name)))
+        return len(passages)
+
+    def search(self, query: str, num: int = 10) -> List[Evidence]:
+        """Returns up to `num` documents, each represented by its best-scoring passage."""
+        terms = set(tokenize(query))
+        total = self.manifest["num_passages"]
+        if not terms or not total:
+            return []
+        avgdl = self.manifest["total_length"] / total
+        segments = self.segments
+
+        scores: Dict[Tuple[int, int], float] = {}
+        for term in terms:
+            df = sum(seg.terms[term][1] for seg in segments if term in seg.terms)
+            if not df:
+                continue
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for seg_id, seg in enumerate(segments):
+                entry = seg.terms.get(term)
+                if entry is None:
+                    continue
+                start, count = entry
+                for i in range(start * 2, (start + count) * 2, 2):
+                    passage_id, tf = seg.postings[i], seg.postings[i + 1]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * seg.lengths[passage_id] / avgdl)
+                    key = (seg_id, passage_id)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        results, seen_urls = [], set()
+        for seg_id, passage_id in heapq.nlargest(num * 5, scores, key=scores.get):
+            passage = segments[seg_id].passage(passage_id)
+            if passage["url"] in seen_urls:
+                continue
+            seen_urls.add(passage["url"])
+            results.append(
+                Evidence(
+                    url=passage["url"],
+                    domain=passage["domain"],
+                    published_date=passage["published_date"],
+                    snippet=passage["text"],
+                )
+            )
+            if len(results) >= num:
+                break
+        return results
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    """Reads documents from a JSONL file with `text`, `url`, `domain`/`source` and `published_date`/`date` fields."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            text = record.get("text") or record.get("content") or ""
+            if record.get("title"):
+                text = f"{record['title']}. {text}"
+            yield {
+                "url": record.get("url", "#"),
+                "domain": record.get("domain") or record.get("source") or "Local",
+                "published_date": record.get("published_date") or record.get("date") or "N/A",
+                "text": text,
+            }
+
+def iter_directory(path: str) -> Iterator[dict]:
+    """Reads every .txt and .md file under `path` as one document."""
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            if not name.lower().endswith((".txt", ".md")):
+                continue
+            file_path = os.path.join(root, name)
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+            modified = datetime.date.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+            yield {"url": f"file://{os.path.abspath(file_path)}", "domain": "Local", "published_date": modified, "text": text}
+
+def ingest(index: BM25Index, source: str) -> int:
+    """Adds a JSONL file or a directory of text files to the index."""
+    documents = iter_directory(source) if os.path.isdir(source) else iter_jsonl(source)
+    return index.add_documents(documents)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python local_index.py INDEX_DIR SOURCE [SOURCE ...]")
+        sys.exit(1)
+    index = BM25Index(sys.argv[1])
+    for source in sys.argv[2:]:
+        print(f"{source}: {ingest(index, source)} passages added")
+    print(f"Index now holds {len(index)} passages in {len(index.segments)} segments.")
@@ -0,0 +1,251 @@
+"""Lightweight in-process instrumentation for the verification pipeline.
+
+Stages are wrapped in `span`/`timed` to record latency histograms and error
+counts; helpers record external calls, LLM token usage and cache lookups.
+Everything can be exported as Prometheus text or a JSON summary. Spans are also
+appended to the current request's trace when one has been started.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import json
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_DURATION = "claim_verifier_stage_duration_seconds"
+STAGE_ERRORS = "claim_verifier_stage_errors_total"
+EXTERNAL_CALLS = "claim_verifier_external_calls_total"
+LLM_TOKENS = "claim_verifier_llm_tokens_total"
+CACHE_LOOKUPS = "claim_verifier_cache_lookups_total"
+CLAIMS_VERIFIED = "claim_verifier_claims_verified_total"
+EVIDENCE_PRUNED = "claim_verifier_evidence_pruned_total"
+STANCE_FALLBACKS = "claim_verifier_stance_fallbacks_total"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing the q-th quantile (an upper estimate)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, bound in enumerate(self.buckets):
+            seen += self.counts[i]
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class Registry:
+    """Thread-safe store of labelled counters and histograms."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        def fmt(labels: Labels, extra: Labels = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted({n for n, _ in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (n, labels), value in sorted(self.counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{fmt(labels)} {value:g}")
+            for name in sorted({n for n, _ in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), hist in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{fmt(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                    lines.append(f"{name}_bucket{fmt(labels, (('le', '+Inf'),))} {hist.count}")
+                    lines.append(f"{name}_sum{fmt(labels)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{fmt(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        """JSON-friendly roll-up: per-stage latency, calls, tokens, cache hit rates and counts."""
+        with self._lock:
+            stages = {}
+            for (name, labels), hist in self.histograms.items():
+                if name == STAGE_DURATION:
+                    stage = dict(labels).get("stage", "")
+                    stages[stage] = {
+                        "count": hist.count,
+                        "total_seconds": round(hist.sum, 6),
+                        "mean_seconds": round(hist.sum / hist.count, 6) if hist.count else 0.0,
+                        "p50_seconds": hist.quantile(0.5),
+                        "p95_seconds": hist.quantile(0.95),
+                        "p99_seconds": hist.quantile(0.99),
+                        "errors": 0,
+                    }
+            calls, tokens, caches, claims_verified, evidence_pruned = {}, {}, {}, 0, 0
+            stance_fallbacks = {}
+            for (name, labels), value in self.counters.items():
+                labels = dict(labels)
+                if name == STAGE_ERRORS:
+                    stages.setdefault(labels.get("stage", ""), {"count": 0, "errors": 0})["errors"] = int(value)
+                elif name == EXTERNAL_CALLS:
+                    calls.setdefault(labels.get("service", ""), {})[labels.get("outcome", "")] = int(value)
+                elif name == LLM_TOKENS:
+                    tokens[labels.get("type", "")] = tokens.get(labels.get("type", ""), 0) + int(value)
+                elif name == CACHE_LOOKUPS:
+                    caches.setdefault(labels.get("cache", ""), {"hit": 0, "miss": 0})[labels.get("result", "")] = int(value)
+                elif name == CLAIMS_VERIFIED:
+                    claims_verified += int(value)
+                elif name == EVIDENCE_PRUNED:
+                    evidence_pruned += int(value)
+                elif name == STANCE_FALLBACKS:
+                    stance_fallbacks.setdefault(labels.get("mode", ""), {})[labels.get("reason", "")] = int(value)
+        for counts in caches.values():
+            lookups = counts.get("hit", 0) + counts.get("miss", 0)
+            counts["hit_rate"] = round(counts.get("hit", 0) / lookups, 4) if lookups else 0.0
+        total_tokens = sum(tokens.values())
+        return {
+            "stages": stages,
+            "external_calls": calls,
+            "llm_tokens": tokens,
+            "caches": caches,
+            "claims_verified": claims_verified,
+            "evidence_pruned": evidence_pruned,
+            "stance_fallbacks": stance_fallbacks,
+            "tokens_per_claim": round(total_tokens / claims_verified, 1) if claims_verified else 0.0,
+        }
+
+REGISTRY = Registry()
+
+_current_trace: ContextVar[Optional[List[dict]]] = ContextVar("claim_verifier_trace", default=None)
+
+def start_trace() -> List[dict]:
+    """Starts collecting spans for the current request; returns the trace list."""
+    trace = []
+    _current_trace.set(trace)
+    return trace
+
+def get_trace() -> List[dict]:
+    return _current_trace.get() or []
+
+def bind_trace(fn: Callable) -> Callable:
+    """Wraps `fn` so it records into the caller's trace when run on a worker thread."""
+    trace = _current_trace.get()
+    if trace is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        token = _current_trace.set(trace)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_trace.reset(token)
+    return run
+
+@contextmanager
+def span(stage: str, **attributes):
+    """Times a pipeline stage, counting it as an error if it raises."""
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = e
+        REGISTRY.inc(STAGE_ERRORS, stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        REGISTRY.observe(STAGE_DURATION, elapsed, stage=stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append({
+                "stage": stage,
+                "start": started,
+                "duration_ms": round(elapsed * 1000, 2),
+                "error": repr(error) if error else None,
+                "thread": threading.current_thread().name,
+                **attributes,
+            })
+
+def timed(stage: str) -> Callable:
+    """Decorator form of `span`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_call(service: str, outcome: str = "ok") -> None:
+    REGISTRY.inc(EXTERNAL_CALLS, service=service, outcome=outcome)
+
+def record_tokens(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    REGISTRY.inc(LLM_TOKENS, prompt_tokens, model=model, type="prompt")
+    REGISTRY.inc(LLM_TOKENS, completion_tokens, model=model, type="completion")
+
+def record_cache(cache: str, hit: bool) -> None:
+    REGISTRY.inc(CACHE_LOOKUPS, cache=cache, result="hit" if hit else "miss")
+
+def record_claim_verified() -> None:
+    REGISTRY.inc(CLAIMS_VERIFIED)
+
+def record_evidence_pruned(count: int) -> None:
+    REGISTRY.inc(EVIDENCE_PRUNED, count)
+
+def record_stance_fallback(mode: str, reason: str, count: int = 1) -> None:
+    """Counts stance requests whose output could not be used ("single" or "batch" mode)."""
+    REGISTRY.inc(STANCE_FALLBACKS, count, mode=mode, reason=reason)
+
+def to_prometheus() -> str:
+    return REGISTRY.to_prometheus()
+
+def summary() -> dict:
+    return REGISTRY.summary()
+
+def summary_json() -> str:
+    return json.dumps(summary(), indent=2)
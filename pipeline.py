@@ -0,0 +1,69 @@
+from typing import Iterator, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from claims import Claim
+from search_retrieval import Evidence, search_for_evidence
+from stance import StanceJudgment, classify_stance, is_failed_judgment
+from scoring import RiskAssessment, score_risk
+from claim_index import get_claim_index, reuse_verdict
+from rerank import prune_evidence
+import metrics
+import os
+
+# Number of claims verified at the same time across the whole pipeline.
+MAX_CONCURRENT_CLAIMS = int(os.environ.get("PIPELINE_MAX_CONCURRENCY", "4"))
+# Stop stance calls once the risk level can no longer change.
+ADAPTIVE_STANCE = os.environ.get("STANCE_ADAPTIVE", "true").lower() in ("1", "true", "yes")
+# Pack several snippets into each stance call. Batching wins when both are on:
+# every snippet is then judged and adaptive stopping does not apply.
+BATCHED_STANCE = os.environ.get("STANCE_BATCHED", "false").lower() in ("1", "true", "yes")
+
+ClaimResult = Tuple[Claim, List[Evidence], List[StanceJudgment], RiskAssessment]
+
+def verify_claim(claim: Claim, use_index: bool = True) -> ClaimResult:
+    """Runs retrieval, stance classification and scoring for a single claim.
+
+    When `use_index` is set, a sufficiently similar and fresh previously
+    verified claim short-circuits retrieval and stance, and its results are
+    reused for this claim.
+    """
+    with metrics.span("verify_claim"):
+        result = _verify_claim(claim, use_index)
+    metrics.record_claim_verified()
+    return result
+
+def _verify_claim(claim: Claim, use_index: bool) -> ClaimResult:
+    index = get_claim_index() if use_index else None
+    if index is not None:
+        match = index.lookup(claim.text)
+        metrics.record_cache("claim_index", match is not None)
+        if match is not None:
+            evidence, judgments, assessment = reuse_verdict(match[0], claim.id)
+            return claim, evidence, judgments, assessment
+
+    evidence = search_for_evidence(claim.text)
+    # Only the most relevant, diverse snippets are worth an LLM call; they come back in relevance order.
+    relevant, pruned = prune_evidence(claim.text, evidence)
+    metrics.record_evidence_pruned(pruned)
+    judgments = classify_stance(claim.text, relevant, batched=BATCHED_STANCE, adaptive=ADAPTIVE_STANCE)
+    for j in judgments:
+        j.claim_id = claim.id
+    assessment = score_risk(claim, judgments)
+
+    # Don't let failed searches or stance calls stand in for future paraphrases.
+    failed = any(e.domain == "Error" for e in evidence) or any(is_failed_judgment(j) for j in judgments)
+    if index is not None and evidence and not failed:
+        index.insert(claim.text, evidence, judgments, assessment)
+    return claim, evidence, judgments, assessment
+
+def verify_claims(claims: List[Claim], max_concurrency: int = MAX_CONCURRENT_CLAIMS, use_index: bool = True) -> Iterator[ClaimResult]:
+    """Verifies claims concurrently, yielding each result as soon as it is ready.
+
+    Claims overlap across stages, so one claim's search runs while another's
+    stance calls are still in flight. Results are yielded in completion order.
+    """
+    if not claims:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(claims)))) as executor:
+        futures = [executor.submit(metrics.bind_trace(verify_claim), c, use_index) for c in claims]
+        for future in as_completed(futures):
+            yield future.result()
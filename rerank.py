@@ -0,0 +1,92 @@
+from typing import List, Set, Tuple
+from search_retrieval import Evidence
+from text_utils import STOPWORDS, numbers
+import os
+import re
+
+# Per-claim budget of snippets forwarded to stance classification.
+MAX_STANCE_EVIDENCE = int(os.environ.get("STANCE_MAX_EVIDENCE", "6"))
+MAX_PER_DOMAIN = int(os.environ.get("RERANK_MAX_PER_DOMAIN", "2"))
+MIN_RELEVANCE = float(os.environ.get("RERANK_MIN_RELEVANCE", "0.1"))
+# Snippets this similar to an already selected one add nothing new.
+DUPLICATE_SIMILARITY = 0.8
+DIVERSITY_PENALTY = 0.3
+
+def _terms(text: str) -> Set[str]:
+    return {w for w in re.findall(r"\w+", (text or "").lower()) if w not in STOPWORDS and len(w) > 1}
+
+def _entities(text: str) -> Set[str]:
+    # Capitalised words, minus stopwords that are only capitalised at the start of a sentence.
+    return {w.lower() for w in re.findall(r"\b[A-Z][\w'-]+", text or "")} - STOPWORDS
+
+def _overlap(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a) if a else 0.0
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+def relevance(claim_text: str, evidence: Evidence) -> float:
+    """Scores a snippet against a claim from 0 to 1.
+
+    Combines claim-term coverage with the share of the claim's numbers and
+    named entities the snippet repeats. Components the claim lacks are left
+    out rather than counted as misses.
+    """
+    if evidence.domain == "Error":
+        return 0.0
+    snippet = evidence.snippet or ""
+    parts = [(0.6, _overlap(_terms(claim_text), _terms(snippet)))]
+    claim_numbers = numbers(claim_text)
+    if claim_numbers:
+        parts.append((0.2, _overlap(claim_numbers, numbers(snippet))))
+    entities = _entities(claim_text)
+    if entities:
+        parts.append((0.2, _overlap(entities, {w.lower() for w in re.findall(r"[\w'-]+", snippet)})))
+    return sum(w * s for w, s in parts) / sum(w for w, _ in parts)
+
+def prune_evidence(
+    claim_text: str,
+    evidence_list: List[Evidence],
+    top_k: int = MAX_STANCE_EVIDENCE,
+    max_per_domain: int = MAX_PER_DOMAIN,
+    min_relevance: float = MIN_RELEVANCE,
+) -> Tuple[List[Evidence], int]:
+    """Selects the most relevant, diverse snippets for stance classification.
+
+    Snippets are picked greedily by relevance, penalised by their similarity to
+    those already chosen, with at most `max_per_domain` per domain and no more
+    than `top_k` overall. The best snippet is always kept so a claim never ends
+    up without judgments. Returns the kept snippets in relevance order and how
+    many were pruned.
+    """
+    if not evidence_list:
+        return [], 0
+
+    scored = sorted(
+        ((relevance(claim_text, e), _terms(e.snippet), e) for e in evidence_list),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+    selected, selected_terms, per_domain = [], [], {}
+    candidates = [item for item in scored if item[0] >= min_relevance]
+    while candidates and len(selected) < top_k:
+        best_index, best_score = None, None
+        for i, (score, terms, evidence) in enumerate(candidates):
+            if per_domain.get(evidence.domain, 0) >= max_per_domain:
+                continue
+            redundancy = max((_similarity(terms, t) for t in selected_terms), default=0.0)
+            if redundancy >= DUPLICATE_SIMILARITY:
+                continue
+            adjusted = score - DIVERSITY_PENALTY * redundancy
+            if best_score is None or adjusted > best_score:
+                best_index, best_score = i, adjusted
+        if best_index is None:
+            break
+        _, terms, evidence = candidates.pop(best_index)
+        selected.append(evidence)
+        selected_terms.append(terms)
+        per_domain[evidence.domain] = per_domain.get(evidence.domain, 0) + 1
+
+    if not selected:
+        selected = [scored[0][2]]
+    return selected, len(evidence_list) - len(selected)
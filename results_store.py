@@ -0,0 +1,129 @@
+"""Columnar persistence for verification results.
+
+Results are written as uncompressed Arrow IPC files, one per table per save,
+under `<root>/date=YYYY-MM-DD/`. Reading memory-maps the files, so loading a
+day's results is a bulk, zero-copy read rather than rebuilding objects one at a
+time. Repetitive string columns (labels, risk levels, domains, rationales) are
+dictionary-encoded to keep files small.
+"""
+from typing import Dict, List, Optional, Tuple
+from claims import Claim
+from search_retrieval import Evidence
+from stance import StanceJudgment
+from scoring import RiskAssessment
+import datetime
+import glob
+import os
+import uuid
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+TABLES = ("claims", "evidence", "judgments", "assessments")
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("results_store requires pyarrow; install it with `pip install pyarrow`.")
+
+def _schemas() -> Dict[str, "pa.Schema"]:
+    category = pa.dictionary(pa.int32(), pa.string())
+    return {
+        "claims": pa.schema([("id", pa.string()), ("text", pa.string()), ("time_context", pa.string())]),
+        "evidence": pa.schema([
+            ("claim_id", pa.string()), ("url", pa.string()), ("domain", category),
+            ("published_date", pa.string()), ("snippet", pa.string()),
+        ]),
+        "judgments": pa.schema([
+            ("claim_id", pa.string()), ("evidence_url", pa.string()), ("label", category),
+            ("confidence", pa.float32()), ("quote_span", pa.string()),
+        ]),
+        "assessments": pa.schema([
+            ("claim_id", pa.string()), ("risk", category), ("score", pa.float32()), ("rationale", category),
+        ]),
+    }
+
+def to_tables(
+    claims: List[Claim],
+    judgments: Dict[str, List[StanceJudgment]],
+    assessments: Dict[str, RiskAssessment],
+    evidence: Optional[Dict[str, List[Evidence]]] = None,
+) -> Dict[str, "pa.Table"]:
+    """Converts results keyed by claim id (as kept in the app session) to Arrow tables."""
+    _require_pyarrow()
+    evidence = evidence or {}
+    columns = {name: {field.name: [] for field in schema} for name, schema in _schemas().items()}
+
+    for c in claims:
+        for key, value in (("id", c.id), ("text", c.text), ("time_context", c.time_context)):
+            columns["claims"][key].append(value)
+        for e in evidence.get(c.id, []):
+            for key in ("url", "domain", "published_date", "snippet"):
+                columns["evidence"][key].append(getattr(e, key))
+            columns["evidence"]["claim_id"].append(c.id)
+        for j in judgments.get(c.id, []):
+            for key in ("evidence_url", "label", "confidence", "quote_span"):
+                columns["judgments"][key].append(getattr(j, key))
+            columns["judgments"]["claim_id"].append(c.id)
+        a = assessments.get(c.id)
+        if a is not None:
+            for key in ("risk", "score", "rationale"):
+                columns["assessments"][key].append(getattr(a, key))
+            columns["assessments"]["claim_id"].append(c.id)
+
+    return {
+        name: pa.Table.from_pydict(columns[name], schema=schema)
+        for name, schema in _schemas().items()
+    }
+
+def save_results(
+    root: str,
+    claims: List[Claim],
+    judgments: Dict[str, List[StanceJudgment]],
+    assessments: Dict[str, RiskAssessment],
+    evidence: Optional[Dict[str, List[Evidence]]] = None,
+    date: Optional[datetime.date] = None,
+) -> str:
+    """Appends a set of results to the store; returns the partition directory."""
+    tables = to_tables(claims, judgments, assessments, evidence)
+    partition = os.path.join(root, f"date={(date or datetime.date.today()).isoformat()}")
+    os.makedirs(partition, exist_ok=True)
+    batch_id = uuid.uuid4().hex
+    for name, table in tables.items():
+        path = os.path.join(partition, f"{name}-{batch_id}.arrow")
+        tmp_path = path + ".tmp"
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        # Readers glob *.arrow, so they never see a half-written file.
+        os.replace(tmp_path, path)
+    return partition
+
+def load_results(root: str, date: Optional[datetime.date] = None) -> Dict[str, "pa.Table"]:
+    """Memory-maps stored results for one day (or all days) into Arrow tables."""
+    _require_pyarrow()
+    pattern = f"date={date.isoformat()}" if date else "date=*"
+    tables = {}
+    for name, schema in _schemas().items():
+        parts = []
+        for path in sorted(glob.glob(os.path.join(root, pattern, f"{name}-*.arrow"))):
+            parts.append(pa.ipc.open_file(pa.memory_map(path, "r")).read_all())
+        tables[name] = pa.concat_tables(parts, promote_options="permissive") if parts else schema.empty_table()
+    return tables
+
+def to_objects(
+    tables: Dict[str, "pa.Table"],
+) -> Tuple[List[Claim], Dict[str, List[StanceJudgment]], Dict[str, RiskAssessment], Dict[str, List[Evidence]]]:
+    """Rebuilds model objects from stored tables, in the shape the app session uses.
+
+    Returns claims, then judgments, assessments and evidence keyed by claim id.
+    """
+    claims = [Claim(text=row["text"], id=row["id"], time_context=row["time_context"]) for row in tables["claims"].to_pylist()]
+    judgments: Dict[str, List[StanceJudgment]] = {}
+    for row in tables["judgments"].to_pylist():
+        judgments.setdefault(row["claim_id"], []).append(StanceJudgment(**row))
+    assessments = {row["claim_id"]: RiskAssessment(**row) for row in tables["assessments"].to_pylist()}
+    evidence: Dict[str, List[Evidence]] = {}
+    for row in tables["evidence"].to_pylist():
+        evidence.setdefault(row.pop("claim_id"), []).append(Evidence(**row))
+    return claims, judgments, assessments, evidence
@@ -1,29 +1,52 @@
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Tuple
+from functools import lru_cache
+from dataclasses import dataclass
+from urllib.parse import urlparse
 from claims import Claim
-from stance import StanceJudgment
+import metrics
+from stance import SKIPPED_LABEL, StanceJudgment
 
+# numpy is imported by the functions that use it to keep start-up cheap.
+if TYPE_CHECKING:
+    import numpy as np
+
+LABEL_CODES = {"SUPPORT": 0, "REFUTE": 1, "NEI": 2}
+# Any other label (e.g. a failed or unknown judgment) lands in this column.
+OTHER_LABEL = len(LABEL_CODES)
+
+# Relative trust in evidence by source; unlisted domains count as 1.0.
+DOMAIN_WEIGHTS = {
+    "apnews.com": 1.3,
+    "cdc.gov": 1.3,
+    "factcheck.org": 1.5,
+    "fullfact.org": 1.5,
+    "politifact.com": 1.5,
+    "reuters.com": 1.3,
+    "snopes.com": 1.5,
+    "who.int": 1.3,
+}
+DEFAULT_DOMAIN_WEIGHT = 1.0
+# Weighted-mode risk bands over the 0..1 score.
+HIGH_RISK_THRESHOLD = 0.65
+LOW_RISK_THRESHOLD = 0.35
+NO_EVIDENCE_SCORE = 0.75
+
+@dataclass(slots=True)
 class RiskAssessment:
     """Data schema for a risk assessment."""
-    def __init__(self, claim_id: str, risk: str, score: float, rationale: str):
-        self.claim_id = claim_id
-        self.risk = risk
-        self.score = score
-        self.rationale = rationale
-
-def score_risk(claim: Claim, judgments: List[StanceJudgment]) -> RiskAssessment:
-    """Calculates a risk score for a claim based on stance judgments."""
-    support_count = sum(1 for j in judgments if j.label == "SUPPORT")
-    refute_count = sum(1 for j in judgments if j.label == "REFUTE")
-    nei_count = sum(1 for j in judgments if j.label == "NEI")
+    claim_id: str
+    risk: str
+    score: float
+    rationale: str
 
-    total_judgments = len(judgments)
-    
+def risk_from_counts(support_count: int, refute_count: int, nei_count: int, total_judgments: int) -> Tuple[str, float, str]:
+    """Applies the count-based scoring rules; returns (risk, score, rationale)."""
     # Simple scoring logic based on the project plan
     if refute_count > support_count:
         risk_score = (refute_count / total_judgments) * 0.8 + 0.2 # Higher base for refuting evidence
         risk = "HIGH"
         rationale = "Multiple sources refute this claim."
-    elif nei_count / total_judgments > 0.5:
+    elif total_judgments and nei_count / total_judgments > 0.5:
         risk_score = 0.5
         risk = "MED"
         rationale = "Lack of independent corroboration or sufficient evidence."
@@ -36,16 +59,157 @@ def score_risk(claim: Claim, judgments: List[StanceJudgment]) -> RiskAssessment:
             risk = "MED"
             rationale = "Some supporting evidence found, but not consistently corroborated."
     else:
-        risk_score = 0.75 # Default to medium if no clear evidence
+        risk_score = NO_EVIDENCE_SCORE # Default to medium if no clear evidence
         risk = "MED"
         rationale = "No clear evidence found to support or refute the claim."
 
     # Clamp the score to be between 0 and 1
     risk_score = max(0.0, min(1.0, risk_score))
+    return risk, risk_score, rationale
+
+@metrics.timed("scoring")
+def score_risk(claim: Claim, judgments: List[StanceJudgment]) -> RiskAssessment:
+    """Calculates a risk score for a claim based on stance judgments.
+
+    Judgments for evidence skipped by adaptive stance evaluation are ignored.
+    """
+    judgments = [j for j in judgments if j.label != SKIPPED_LABEL]
+    support_count = sum(1 for j in judgments if j.label == "SUPPORT")
+    refute_count = sum(1 for j in judgments if j.label == "REFUTE")
+    nei_count = sum(1 for j in judgments if j.label == "NEI")
+
+    risk, risk_score, rationale = risk_from_counts(support_count, refute_count, nei_count, len(judgments))
     
     return RiskAssessment(
         claim_id=claim.id,
         risk=risk,
         score=risk_score,
         rationale=rationale
-    )
\ No newline at end of file
+    )
+
+@lru_cache(maxsize=65536)
+def domain_weight(url: str) -> float:
+    """Trust weight for the site an evidence URL points to."""
+    host = urlparse(url or "").netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    while host:
+        if host in DOMAIN_WEIGHTS:
+            return DOMAIN_WEIGHTS[host]
+        host = host.partition(".")[2]
+    return DEFAULT_DOMAIN_WEIGHT
+
+def _pack(claims: List[Claim], judgments_by_claim: Dict[str, List[StanceJudgment]]):
+    """Flattens judgments into parallel arrays of owner index, label code, confidence and domain weight."""
+    import numpy as np
+    owners, labels, confidences, weights = [], [], [], []
+    for i, claim in enumerate(claims):
+        for j in judgments_by_claim.get(claim.id, []):
+            if j.label == SKIPPED_LABEL:
+                continue
+            owners.append(i)
+            labels.append(LABEL_CODES.get(j.label, OTHER_LABEL))
+            confidences.append(j.confidence)
+            weights.append(domain_weight(j.evidence_url))
+    return (
+        np.asarray(owners, dtype=np.int64),
+        np.asarray(labels, dtype=np.int64),
+        np.clip(np.asarray(confidences, dtype=np.float64), 0.0, 1.0),
+        np.asarray(weights, dtype=np.float64),
+    )
+
+def _label_totals(owners: "np.ndarray", labels: "np.ndarray", n_claims: int, weights=None) -> "np.ndarray":
+    """Per-claim (optionally weighted) totals, one column per label code."""
+    import numpy as np
+    width = OTHER_LABEL + 1
+    return np.bincount(owners * width + labels, weights=weights, minlength=n_claims * width).reshape(n_claims, width)
+
+def _compat_scores(counts: "np.ndarray"):
+    """Vectorized equivalent of score_risk's count-based rules."""
+    import numpy as np
+    support, refute, nei = counts[:, 0], counts[:, 1], counts[:, 2]
+    total = counts.sum(axis=1)
+    safe_total = np.where(total > 0, total, 1)
+
+    refuted = refute > support
+    unclear = ~refuted & (total > 0) & (nei / safe_total > 0.5)
+    supported = ~refuted & ~unclear & (support > 0)
+    strongly_supported = supported & (support / safe_total > 0.8)
+
+    scores = np.select(
+        [refuted, unclear, supported],
+        [refute / safe_total * 0.8 + 0.2, 0.5, 1.0 - support / safe_total * 0.7],
+        NO_EVIDENCE_SCORE,
+    )
+    risks = np.select([refuted, strongly_supported], ["HIGH", "LOW"], "MED")
+    rationales = np.select(
+        [refuted, unclear, strongly_supported, supported],
+        [
+            "Multiple sources refute this claim.",
+            "Lack of independent corroboration or sufficient evidence.",
+            "Multiple sources independently support this claim.",
+            "Some supporting evidence found, but not consistently corroborated.",
+        ],
+        "No clear evidence found to support or refute the claim.",
+    )
+    return np.clip(scores, 0.0, 1.0), risks, rationales
+
+def _weighted_scores(weighted: "np.ndarray"):
+    """Scores from confidence- and domain-weighted label mass.
+
+    The score moves from 0.5 towards 1 as refuting weight dominates and towards
+    0 as supporting weight dominates; NEI weight pulls it back to 0.5.
+    """
+    import numpy as np
+    support, refute, nei = weighted[:, 0], weighted[:, 1], weighted[:, 2]
+    mass = support + refute + nei
+    has_evidence = mass > 0
+    net = np.divide(refute - support, mass, out=np.zeros_like(mass), where=has_evidence)
+    scores = np.where(has_evidence, 0.5 + 0.5 * net, NO_EVIDENCE_SCORE)
+
+    high = has_evidence & (scores >= HIGH_RISK_THRESHOLD)
+    low = has_evidence & (scores <= LOW_RISK_THRESHOLD)
+    decisive = support + refute
+    unclear = has_evidence & ~high & ~low & (nei > decisive)
+    risks = np.select([high, low], ["HIGH", "LOW"], "MED")
+    rationales = np.select(
+        [high, low, unclear, has_evidence],
+        [
+            "Credible sources predominantly refute this claim.",
+            "Credible sources predominantly support this claim.",
+            "Lack of independent corroboration or sufficient evidence.",
+            "Evidence is mixed; sources disagree about this claim.",
+        ],
+        "No clear evidence found to support or refute the claim.",
+    )
+    return np.clip(scores, 0.0, 1.0), risks, rationales
+
+@metrics.timed("scoring_batch")
+def score_risks(
+    claims: List[Claim],
+    judgments_by_claim: Dict[str, List[StanceJudgment]],
+    mode: str = "weighted",
+) -> List[RiskAssessment]:
+    """Scores many claims in one vectorized pass.
+
+    `judgments_by_claim` maps claim ids to their judgments. In "weighted" mode
+    each judgment counts in proportion to its confidence and the trust weight of
+    its domain. "compat" mode reproduces score_risk's thresholds exactly.
+    Skipped judgments are ignored in both modes.
+    """
+    import numpy as np
+    if not claims:
+        return []
+    owners, labels, confidences, weights = _pack(claims, judgments_by_claim)
+
+    if mode == "compat":
+        scores, risks, rationales = _compat_scores(_label_totals(owners, labels, len(claims)))
+    elif mode == "weighted":
+        scores, risks, rationales = _weighted_scores(_label_totals(owners, labels, len(claims), confidences * weights))
+    else:
+        raise ValueError(f"Unknown scoring mode: {mode}")
+
+    return [
+        RiskAssessment(claim_id=claim.id, risk=str(risk), score=float(score), rationale=str(rationale))
+        for claim, score, risk, rationale in zip(claims, scores, risks, rationales)
+    ]
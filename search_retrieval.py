@@ -1,47 +1,167 @@
 import os
-from typing import List
-# from serpapi import SerpApiSearch # Import the correct class
-from serpapi import GoogleSearch
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from cache import SQLiteCache, make_key, normalize_query
+import metrics
 
+SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", str(3 * 24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+# One of "serpapi", "local" or "hybrid".
+RETRIEVAL_BACKEND = os.environ.get("RETRIEVAL_BACKEND", "serpapi")
+LOCAL_INDEX_DIR = os.environ.get("LOCAL_INDEX_DIR", "local_index")
+# Overrides the SerpAPI host, e.g. to point at a local stand-in server.
+SERPAPI_BASE_URL = os.environ.get("SERPAPI_BASE_URL")
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+_backends = {}
+_backends_lock = threading.Lock()
+
+@dataclass(slots=True)
 class Evidence:
     """Data schema for a piece of evidence."""
-    def __init__(self, url: str, domain: str, published_date: str, snippet: str):
-        self.url = url
-        self.domain = domain
-        self.published_date = published_date
-        self.snippet = snippet
-
-def search_for_evidence(claim_text: str) -> List[Evidence]:
-    """Uses SERPAPI to find relevant web pages for a claim."""
-    api_key = os.environ.get("SERPAPI_API_KEY")
-    if not api_key:
-        return [Evidence(url="#", domain="Error", published_date="", snippet="SERPAPI_API_KEY not set.")]
-    
-    params = {
-        "q": claim_text,
-        "api_key": api_key,
-        "engine": "google",
-        "num": 10,
-    }
-
-    try:
-        # Create an instance of the class
-        # search = SerpApiSearch(params=params)
-        search = GoogleSearch(params)
-        # Call the get_dict method on the instance
-        search_results = search.get_dict()
-        
-        evidence_list = []
+    url: str
+    domain: str
+    published_date: str
+    snippet: str
+
+def get_search_cache() -> SQLiteCache:
+    """Returns the process-wide cache of parsed search results."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SQLiteCache("search", ttl_seconds=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_MAX_ENTRIES)
+        return _search_cache
+
+class RetrievalBackend:
+    """Interface for evidence sources."""
+    name = "base"
+
+    def search(self, claim_text: str, num: int = 10, use_cache: bool = True, refresh: bool = False) -> List[Evidence]:
+        raise NotImplementedError
+
+class SerpApiBackend(RetrievalBackend):
+    """Google results via SerpAPI, cached on disk by normalized query."""
+    name = "serpapi"
+
+    def search(self, claim_text: str, num: int = 10, use_cache: bool = True, refresh: bool = False) -> List[Evidence]:
+        api_key = os.environ.get("SERPAPI_API_KEY")
+        if not api_key:
+            return [Evidence(url="#", domain="Error", published_date="", snippet="SERPAPI_API_KEY not set.")]
         
-        for result in search_results.get("organic_results", []):
-            evidence_list.append(
-                Evidence(
-                    url=result.get("link", "#"),
-                    domain=result.get("source", "N/A"),
-                    published_date=result.get("date", "N/A"),
-                    snippet=result.get("snippet", "No snippet available.")
+        params = {
+            "q": claim_text,
+            "api_key": api_key,
+            "engine": "google",
+            "num": num,
+        }
+
+        cache_key = make_key("google", normalize_query(claim_text), params["engine"], params["num"])
+        if use_cache and not refresh:
+            cached = get_search_cache().get(cache_key)
+            metrics.record_cache("search", cached is not None)
+            if cached is not None:
+                return cached
+
+        try:
+            # Imported here so loading this module doesn't pull in the SerpAPI client.
+            from serpapi import GoogleSearch
+            # Create an instance of the class
+            # search = SerpApiSearch(params=params)
+            search = GoogleSearch(params)
+            if SERPAPI_BASE_URL:
+                search.BACKEND = SERPAPI_BASE_URL.rstrip("/")
+            # Call the get_dict method on the instance
+            search_results = search.get_dict()
+            metrics.record_call("serpapi", "error" if "error" in search_results else "ok")
+            
+            evidence_list = []
+            
+            for result in search_results.get("organic_results", []):
+                evidence_list.append(
+                    Evidence(
+                        url=result.get("link", "#"),
+                        domain=result.get("source", "N/A"),
+                        published_date=result.get("date", "N/A"),
+                        snippet=result.get("snippet", "No snippet available.")
+                    )
                 )
-            )
-        return evidence_list
-    except Exception as e:
-        return [Evidence(url="#", domain="Error", published_date="", snippet=f"Search API Error: {e}")]
\ No newline at end of file
+            # Error payloads come back without organic results; only cache real hits.
+            if use_cache and "error" not in search_results:
+                get_search_cache().set(cache_key, evidence_list)
+            return evidence_list
+        except Exception as e:
+            metrics.record_call("serpapi", "error")
+            return [Evidence(url="#", domain="Error", published_date="", snippet=f"Search API Error: {e}")]
+
+class LocalBackend(RetrievalBackend):
+    """BM25 search over a local index of fact-check and reference documents."""
+    name = "local"
+
+    def __init__(self, index_dir: str = LOCAL_INDEX_DIR):
+        from local_index import BM25Index
+        self.index = BM25Index(index_dir)
+
+    def search(self, claim_text: str, num: int = 10, use_cache: bool = True, refresh: bool = False) -> List[Evidence]:
+        try:
+            return self.index.search(claim_text, num=num)
+        except Exception as e:
+            return [Evidence(url="#", domain="Error", published_date="", snippet=f"Local Index Error: {e}")]
+
+class HybridBackend(RetrievalBackend):
+    """Queries several backends concurrently and interleaves their results.
+
+    Duplicate URLs are dropped, and error placeholders are kept only when no
+    backend returned real evidence.
+    """
+    name = "hybrid"
+
+    def __init__(self, backends: List[RetrievalBackend]):
+        self.backends = backends
+
+    def search(self, claim_text: str, num: int = 10, use_cache: bool = True, refresh: bool = False) -> List[Evidence]:
+        with ThreadPoolExecutor(max_workers=len(self.backends)) as executor:
+            result_lists = list(executor.map(
+                metrics.bind_trace(lambda backend: backend.search(claim_text, num=num, use_cache=use_cache, refresh=refresh)), self.backends
+            ))
+
+        merged, errors, seen_urls = [], [], set()
+        for rank in range(max((len(r) for r in result_lists), default=0)):
+            for results in result_lists:
+                if rank >= len(results):
+                    continue
+                evidence = results[rank]
+                if evidence.domain == "Error":
+                    errors.append(evidence)
+                elif evidence.url not in seen_urls:
+                    seen_urls.add(evidence.url)
+                    merged.append(evidence)
+        return merged[:num] if merged else errors[:1]
+
+def get_backend(name: Optional[str] = None) -> RetrievalBackend:
+    """Returns the shared backend for `name` (defaults to RETRIEVAL_BACKEND)."""
+    name = name or RETRIEVAL_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            if name == "serpapi":
+                _backends[name] = SerpApiBackend()
+            elif name == "local":
+                _backends[name] = LocalBackend()
+            elif name == "hybrid":
+                _backends[name] = HybridBackend([LocalBackend(), SerpApiBackend()])
+            else:
+                raise ValueError(f"Unknown retrieval backend: {name}")
+        return _backends[name]
+
+@metrics.timed("retrieval")
+def search_for_evidence(claim_text: str, use_cache: bool = True, refresh: bool = False, backend: Optional[RetrievalBackend] = None) -> List[Evidence]:
+    """Finds relevant evidence for a claim using the configured retrieval backend.
+
+    SerpAPI results are cached on disk by normalized query; pass `refresh=True`
+    to bypass a cached entry and overwrite it, or `use_cache=False` to skip the
+    cache entirely.
+    """
+    backend = backend or get_backend()
+    return backend.search(claim_text, num=10, use_cache=use_cache, refresh=refresh)
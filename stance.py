@@ -1,80 +1,347 @@
-from typing import List
+from typing import Dict, List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from claims import Claim
 from search_retrieval import Evidence
-import openai
+from text_utils import estimate_tokens
+import llm
+import metrics
 import os
 
+# Upper bound on stance requests in flight for a single claim.
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("STANCE_MAX_CONCURRENCY", "5"))
+# Rough prompt budget for the evidence section of one batched request.
+MAX_BATCH_TOKENS = int(os.environ.get("STANCE_MAX_BATCH_TOKENS", "3000"))
+
+VALID_LABELS = ("SUPPORT", "REFUTE", "NEI")
+# Label for evidence left unjudged once the verdict was settled; scoring ignores it.
+SKIPPED_LABEL = "SKIPPED"
+# quote_span of the NEI fallback returned when a stance request fails.
+ERROR_QUOTE = "Error processing this evidence."
+
+@dataclass(slots=True)
 class StanceJudgment:
     """Data schema for stance classification."""
-    def __init__(self, claim_id: str, evidence_url: str, label: str, confidence: float, quote_span: str):
-        self.claim_id = claim_id
-        self.evidence_url = evidence_url
-        self.label = label
-        self.confidence = confidence
-        self.quote_span = quote_span
-
-def classify_stance(claim_text: str, evidence_list: List[Evidence]) -> List[StanceJudgment]:
-    """Classifies the stance of each evidence snippet relative to a claim."""
-    client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-    judgments = []
-
-    for evidence in evidence_list:
-        prompt = f"""
-        You are an expert fact-checker. Your task is to determine the stance of the provided EVIDENCE relative to the CLAIM.
-        The stance can be one of three labels: SUPPORT, REFUTE, or NEI (Not Enough Info).
-        You must also extract a direct quote from the EVIDENCE that best supports your stance.
-        
-        CLAIM: "{claim_text}"
-        
-        EVIDENCE (Snippet from {evidence.domain}): "{evidence.snippet}"
-        
-        Based on the evidence snippet, what is the stance?
-        Provide a JSON object with the following keys:
-        - "label": The stance label (SUPPORT, REFUTE, or NEI).
-        - "confidence": A confidence score (0.0 to 1.0).
-        - "quote_span": The exact quote from the EVIDENCE snippet that justifies your label.
-        
-        Example Output:
-        ```json
-        {{
-            "label": "SUPPORT",
-            "confidence": 0.95,
-            "quote_span": "The device can run for up to 500 hours on a single charge"
-        }}
-        ```
-        
-        Output:
-        """
-        
+    claim_id: str
+    evidence_url: str
+    label: str
+    confidence: float
+    quote_span: str
+
+def _as_confidence(value) -> float:
+    """Model-reported confidence as a float; 0.0 if it isn't a number (e.g. "high")."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _parse_judgment(content: str) -> dict:
+    """Parses a single-snippet reply; raises ValueError unless it is JSON with a valid label."""
+    import json
+    data = json.loads(content)
+    label = str(data.get("label", "")).upper() if isinstance(data, dict) else ""
+    if label not in VALID_LABELS:
+        raise ValueError(f"no valid stance label in reply: {content[:80]!r}")
+    return {
+        "label": label,
+        "confidence": _as_confidence(data.get("confidence", 0.0)),
+        "quote_span": str(data.get("quote_span") or ""),
+    }
+
+def _classify_single(claim_text: str, evidence: Evidence) -> StanceJudgment:
+    """Classifies one evidence snippet, falling back to NEI on any error."""
+    prompt = f"""
+    You are an expert fact-checker. Your task is to determine the stance of the provided EVIDENCE relative to the CLAIM.
+    The stance can be one of three labels: SUPPORT, REFUTE, or NEI (Not Enough Info).
+    You must also extract a direct quote from the EVIDENCE that best supports your stance.
+    
+    CLAIM: "{claim_text}"
+    
+    EVIDENCE (Snippet from {evidence.domain}): "{evidence.snippet}"
+    
+    Based on the evidence snippet, what is the stance?
+    Provide a JSON object with the following keys:
+    - "label": The stance label (SUPPORT, REFUTE, or NEI).
+    - "confidence": A confidence score (0.0 to 1.0).
+    - "quote_span": The exact quote from the EVIDENCE snippet that justifies your label.
+    
+    Example Output:
+    ```json
+    {{
+        "label": "SUPPORT",
+        "confidence": 0.95,
+        "quote_span": "The device can run for up to 500 hours on a single charge"
+    }}
+    ```
+    
+    Output:
+    """
+    
+    try:
+        content = llm.chat_completion(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+            response_format={"type": "json_object"},
+            validate=_parse_judgment,
+        )
+    except Exception:
+        return _failed_judgment(evidence, "request")
+    try:
+        judgment_data = _parse_judgment(content)
+    except Exception:
+        return _failed_judgment(evidence, "invalid_reply")
+
+    return StanceJudgment(
+        claim_id="", # Placeholder, will be filled in the main app
+        evidence_url=evidence.url,
+        label=judgment_data["label"],
+        confidence=judgment_data["confidence"],
+        quote_span=judgment_data["quote_span"]
+    )
+
+def _failed_judgment(evidence: Evidence, reason: str) -> StanceJudgment:
+    """The NEI fallback for a snippet that could not be classified, counted by `reason`."""
+    metrics.record_stance_fallback("single", reason)
+    return StanceJudgment(
+        claim_id="",
+        evidence_url=evidence.url,
+        label="NEI",
+        confidence=0.0,
+        quote_span=ERROR_QUOTE
+    )
+
+def is_failed_judgment(judgment: StanceJudgment) -> bool:
+    """True for the NEI fallback recorded when classifying a snippet failed."""
+    return judgment.confidence == 0.0 and judgment.quote_span == ERROR_QUOTE
+
+def _split_batches(evidence_list: List[Evidence], max_tokens: int) -> List[List[int]]:
+    """Groups evidence indices so each batch's snippets fit within `max_tokens`."""
+    batches, current, used = [], [], 0
+    for i, evidence in enumerate(evidence_list):
+        cost = estimate_tokens(evidence.snippet) + estimate_tokens(evidence.domain) + 8
+        if current and used + cost > max_tokens:
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _classify_batch(claim_text: str, evidence_list: List[Evidence], indices: List[int]) -> Dict[int, StanceJudgment]:
+    """Classifies several snippets in one request.
+
+    Returns judgments keyed by evidence index; indices missing from the result
+    had malformed or absent output and should be retried individually.
+    """
+    evidence_block = "\n".join(
+        f'[{i}] (Snippet from {evidence_list[i].domain}): "{evidence_list[i].snippet}"' for i in indices
+    )
+    prompt = f"""
+    You are an expert fact-checker. Your task is to determine the stance of each numbered EVIDENCE snippet relative to the CLAIM.
+    The stance can be one of three labels: SUPPORT, REFUTE, or NEI (Not Enough Info).
+    For each snippet you must also extract a direct quote from that snippet that best supports your stance.
+    
+    CLAIM: "{claim_text}"
+    
+    EVIDENCE:
+    {evidence_block}
+    
+    Provide a JSON object with a single key "judgments" holding one entry per snippet, each with the following keys:
+    - "index": The number of the snippet, as given in brackets.
+    - "label": The stance label (SUPPORT, REFUTE, or NEI).
+    - "confidence": A confidence score (0.0 to 1.0).
+    - "quote_span": The exact quote from that snippet that justifies your label.
+    
+    Example Output:
+    ```json
+    {{
+        "judgments": [
+            {{"index": 0, "label": "SUPPORT", "confidence": 0.95, "quote_span": "The device can run for up to 500 hours on a single charge"}},
+            {{"index": 1, "label": "NEI", "confidence": 0.6, "quote_span": ""}}
+        ]
+    }}
+    ```
+    
+    Output:
+    """
+
+    try:
+        content = llm.chat_completion(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+            response_format={"type": "json_object"},
+            validate=lambda reply: _require_complete(_parse_batch(reply, evidence_list, indices), indices),
+        )
+    except Exception:
+        metrics.record_stance_fallback("batch", "request", len(indices))
+        return {}
+    try:
+        results = _parse_batch(content, evidence_list, indices)
+    except Exception:
+        metrics.record_stance_fallback("batch", "invalid_reply", len(indices))
+        return {}
+    if len(results) < len(indices):
+        metrics.record_stance_fallback("batch", "missing", len(indices) - len(results))
+    return results
+
+def _require_complete(results: Dict[int, StanceJudgment], indices: List[int]) -> None:
+    if len(results) < len(indices):
+        raise ValueError(f"batch reply covered {len(results)} of {len(indices)} snippets")
+
+def _parse_batch(content: str, evidence_list: List[Evidence], indices: List[int]) -> Dict[int, StanceJudgment]:
+    """Parses a batched reply into judgments keyed by index, skipping malformed entries.
+
+    Raises ValueError if the reply is not JSON.
+    """
+    import json
+    data = json.loads(content)
+    items = data.get("judgments", []) if isinstance(data, dict) else []
+    results = {}
+    for item in items if isinstance(items, list) else []:
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-                response_format={"type": "json_object"}
-            )
-            import json
-            judgment_data = json.loads(response.choices[0].message.content)
-            
-            judgments.append(
-                StanceJudgment(
-                    claim_id="", # Placeholder, will be filled in the main app
-                    evidence_url=evidence.url,
-                    label=judgment_data.get("label", "NEI"),
-                    confidence=judgment_data.get("confidence", 0.0),
-                    quote_span=judgment_data.get("quote_span", "")
-                )
-            )
-        except Exception as e:
-            print(f"Error classifying stance for evidence {evidence.url}: {e}")
-            judgments.append(
-                StanceJudgment(
-                    claim_id="",
-                    evidence_url=evidence.url,
-                    label="NEI",
-                    confidence=0.0,
-                    quote_span="Error processing this evidence."
-                )
-            )
-            
-    return judgments
\ No newline at end of file
+            index = int(item["index"])
+            label = str(item["label"]).upper()
+            confidence = float(item.get("confidence", 0.0))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if index not in indices or label not in VALID_LABELS:
+            continue
+        results[index] = StanceJudgment(
+            claim_id="",
+            evidence_url=evidence_list[index].url,
+            label=label,
+            confidence=confidence,
+            quote_span=item.get("quote_span", "")
+        )
+    return results
+
+def _run_concurrently(fn, items: list, max_concurrency: int) -> list:
+    """Maps `fn` over `items` with bounded concurrency, preserving order."""
+    if max_concurrency <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+        return list(executor.map(metrics.bind_trace(fn), items))
+
+def _counts(judgments: List[StanceJudgment]) -> tuple:
+    support = sum(1 for j in judgments if j.label == "SUPPORT")
+    refute = sum(1 for j in judgments if j.label == "REFUTE")
+    nei = sum(1 for j in judgments if j.label == "NEI")
+    return support, refute, nei, len(judgments)
+
+def _splits(count: int):
+    """Every (support, refute, nei) split of `count` further judgments."""
+    for support in range(count + 1):
+        for refute in range(count - support + 1):
+            yield support, refute, count - support - refute
+
+def _settled(support: int, refute: int, nei: int, total: int, remaining: int) -> bool:
+    from scoring import risk_from_counts
+
+    current = risk_from_counts(support, refute, nei, total)[0]
+    return all(
+        risk_from_counts(support + s, refute + r, nei + n, total + remaining)[0] == current
+        for s, r, n in _splits(remaining)
+    )
+
+def verdict_settled(judgments: List[StanceJudgment], remaining: int) -> bool:
+    """True if no labels for the `remaining` items could change the risk level.
+
+    Every split of the remaining items into SUPPORT/REFUTE/NEI is checked
+    against score_risk's rules, and so is stopping now.
+    """
+    return _settled(*_counts(judgments), remaining)
+
+def results_needed(judgments: List[StanceJudgment], remaining: int) -> int:
+    """Fewest further judgments after which the verdict could possibly be settled.
+
+    Those judgments are needed whatever they turn out to be, so they can all be
+    requested at once without wasting a call.
+    """
+    support, refute, nei, total = _counts(judgments)
+    for needed in range(remaining + 1):
+        if any(
+            _settled(support + s, refute + r, nei + n, total + needed, remaining - needed)
+            for s, r, n in _splits(needed)
+        ):
+            return needed
+    return remaining
+
+def _classify_adaptive(claim_text: str, evidence_list: List[Evidence], max_concurrency: int) -> List[StanceJudgment]:
+    """Classifies evidence in list order until the verdict is settled.
+
+    After every result, requests are topped up to the number of further
+    results the verdict needs in any case (at most `max_concurrency`), so it
+    makes the same calls as classifying one snippet at a time and stopping as
+    soon as possible, with as much of that work in parallel as is safe.
+    """
+    classify_one = metrics.bind_trace(lambda evidence: _classify_single(claim_text, evidence))
+    results, pending, submitted = {}, {}, 0
+    window = min(max(1, max_concurrency), results_needed([], len(evidence_list)))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(evidence_list)))) as executor:
+        while window or pending:
+            # In-flight requests count as undecided, like the ones not yet started.
+            while submitted < len(evidence_list) and len(pending) < window:
+                pending[executor.submit(classify_one, evidence_list[submitted])] = submitted
+                submitted += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+            if window:
+                needed = results_needed(list(results.values()), len(evidence_list) - len(results))
+                window = min(max(1, max_concurrency), needed)
+
+    judgments = [results[i] for i in range(submitted)]
+    skipped = evidence_list[submitted:]
+    if skipped:
+        metrics.REGISTRY.inc("claim_verifier_stance_skipped_total", len(skipped))
+    return judgments + [
+        StanceJudgment(claim_id="", evidence_url=evidence.url, label=SKIPPED_LABEL, confidence=0.0, quote_span="")
+        for evidence in skipped
+    ]
+
+@metrics.timed("stance")
+def classify_stance(
+    claim_text: str,
+    evidence_list: List[Evidence],
+    max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+    batched: bool = False,
+    max_batch_tokens: int = MAX_BATCH_TOKENS,
+    adaptive: bool = False,
+) -> List[StanceJudgment]:
+    """Classifies the stance of each evidence snippet relative to a claim.
+
+    Snippets are classified concurrently with at most `max_concurrency` requests
+    in flight; judgments are returned in the same order as `evidence_list`.
+    With `batched=True`, snippets are packed into as few requests as fit within
+    `max_batch_tokens`, and any snippet the batch output misses is re-classified
+    on its own.
+    With `adaptive=True` (ignored when batched), evidence is classified in list
+    order, which should be relevance order, and stops once no remaining
+    outcome could change score_risk's risk level, re-checking after every
+    result. The rest are returned with the SKIPPED label.
+    """
+    if not evidence_list:
+        return []
+
+    classify_one = lambda i: _classify_single(claim_text, evidence_list[i])
+
+    if adaptive and not batched:
+        return _classify_adaptive(claim_text, evidence_list, max_concurrency)
+    if not batched:
+        return _run_concurrently(classify_one, list(range(len(evidence_list))), max_concurrency)
+
+    batches = _split_batches(evidence_list, max_batch_tokens)
+    results = {}
+    for batch_result in _run_concurrently(
+        lambda indices: _classify_batch(claim_text, evidence_list, indices), batches, max_concurrency
+    ):
+        results.update(batch_result)
+
+    missing = [i for i in range(len(evidence_list)) if i not in results]
+    for i, judgment in zip(missing, _run_concurrently(classify_one, missing, max_concurrency)):
+        results[i] = judgment
+
+    return [results[i] for i in range(len(evidence_list))]
@@ -0,0 +1,34 @@
+"""Near-duplicate lookup must not reuse verdicts of claims that say something different.
+
+Run with: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from claim_index import ClaimIndex
+from scoring import RiskAssessment
+
+CLAIM = "The new vaccine reduced hospital admissions by 40 percent in a trial of 3,000 people."
+
+def _index():
+    index = ClaimIndex()
+    index.insert(CLAIM, [], [], RiskAssessment("original", "LOW", 0.2, "Supported."))
+    return index
+
+def test_paraphrase_reuses_verdict():
+    match = _index().lookup("the new vaccine reduced hospital admissions by 40 percent in a trial of 3,000 people!")
+    assert match is not None
+    assert match[0].assessment.risk == "LOW"
+
+def test_meaning_changes_do_not_match():
+    index = _index()
+    for variant in (
+        "The new vaccine did not reduce hospital admissions by 40 percent in a trial of 3,000 people.",
+        "The new vaccine didn't reduce hospital admissions by 40 percent in a trial of 3,000 people.",
+        "The new vaccine reduced hospital admissions by 4 percent in a trial of 3,000 people.",
+        "The new vaccine reduced hospital admissions by 40 percent in a trial of 300 people.",
+        "The new vaccine increased hospital admissions by 40 percent in a trial of 3,000 people.",
+    ):
+        assert index.lookup(variant) is None, variant
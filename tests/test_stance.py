@@ -0,0 +1,99 @@
+"""Adaptive stance classification must stop early without changing the verdict,
+and batched classification must fall back per snippet when a batch reply is unusable.
+
+Run with: python -m pytest tests
+"""
+import json
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import llm
+import stance
+from scoring import risk_from_counts
+from search_retrieval import Evidence
+
+LABELS = ["SUPPORT", "REFUTE", "NEI"]
+
+def _risk(labels):
+    return risk_from_counts(labels.count("SUPPORT"), labels.count("REFUTE"), labels.count("NEI"), len(labels))[0]
+
+def _sequential_calls(labels):
+    """Calls made by classifying one snippet at a time and stopping as soon as the verdict settles."""
+    for k in range(1, len(labels) + 1):
+        judged = [stance.StanceJudgment("", "", label, 1.0, "") for label in labels[:k]]
+        if stance.verdict_settled(judged, len(labels) - k):
+            return k
+    return len(labels)
+
+def _classify(monkeypatch, labels, max_concurrency=5):
+    """Runs adaptive classification where each snippet's label is its text."""
+    monkeypatch.setattr(
+        stance, "_classify_single",
+        lambda claim_text, evidence: stance.StanceJudgment("", evidence.url, evidence.snippet, 0.9, ""),
+    )
+    evidence = [Evidence(f"https://example.com/{i}", "example.com", None, label) for i, label in enumerate(labels)]
+    return stance.classify_stance("claim", evidence, max_concurrency=max_concurrency, adaptive=True)
+
+def test_adaptive_matches_full_verdict(monkeypatch):
+    rng = random.Random(1729)
+    for _ in range(300):
+        weights = rng.choice([(8, 1, 1), (1, 8, 1), (1, 1, 1), (6, 2, 2)])
+        labels = rng.choices(LABELS, weights=weights, k=rng.randint(1, 8))
+        judgments = _classify(monkeypatch, labels, max_concurrency=rng.randint(1, 6))
+        judged = [j.label for j in judgments if j.label != stance.SKIPPED_LABEL]
+        assert len(judgments) == len(labels)
+        assert judged == labels[:len(judged)]
+        assert _risk(judged) == _risk(labels)
+        assert len(judged) == _sequential_calls(labels)
+
+def test_adaptive_skips_once_settled(monkeypatch):
+    judgments = _classify(monkeypatch, ["REFUTE"] * 6)
+    assert [j.label for j in judgments] == ["REFUTE"] * 4 + [stance.SKIPPED_LABEL] * 2
+
+def _classify_batched(monkeypatch, labels, batch_reply):
+    """Runs batched classification where every batch request gets `batch_reply`.
+
+    Single-snippet fallbacks answer with the snippet's text as the label.
+    Returns the judgments and the snippets that were re-classified one at a time.
+    """
+    singles = []
+
+    def chat_completion(model, messages, temperature, response_format=None, use_cache=True, validate=None):
+        prompt = messages[0]["content"]
+        if '"judgments"' in prompt:
+            return batch_reply
+        snippet = re.search(r'EVIDENCE \(Snippet from [^)]*\): "([^"]*)"', prompt).group(1)
+        singles.append(snippet)
+        return json.dumps({"label": snippet.split("-")[0], "confidence": 0.9, "quote_span": ""})
+
+    monkeypatch.setattr(llm, "chat_completion", chat_completion)
+    evidence = [Evidence(f"https://example.com/{i}", "example.com", None, f"{label}-{i}") for i, label in enumerate(labels)]
+    return stance.classify_stance("claim", evidence, max_concurrency=1, batched=True), singles
+
+def test_batched_partial_reply_falls_back_for_missing(monkeypatch):
+    reply = json.dumps({"judgments": [
+        {"index": 0, "label": "support", "confidence": 0.8, "quote_span": "q"},
+        {"index": 2, "label": "MAYBE", "confidence": 0.8, "quote_span": ""},
+        {"index": 7, "label": "REFUTE", "confidence": 0.8, "quote_span": ""},
+    ]})
+    judgments, singles = _classify_batched(monkeypatch, ["SUPPORT", "REFUTE", "NEI"], reply)
+    assert [j.label for j in judgments] == ["SUPPORT", "REFUTE", "NEI"]
+    assert [j.evidence_url for j in judgments] == [f"https://example.com/{i}" for i in range(3)]
+    assert singles == ["REFUTE-1", "NEI-2"]
+
+@pytest.mark.parametrize("reply", [
+    "not json",
+    "[]",
+    json.dumps({"judgments": "none"}),
+    json.dumps({"judgments": [{"label": "SUPPORT"}, {"index": "x", "label": "REFUTE"}, {"index": 1}]}),
+])
+def test_batched_malformed_reply_falls_back_per_item(monkeypatch, reply):
+    judgments, singles = _classify_batched(monkeypatch, ["REFUTE", "SUPPORT"], reply)
+    assert [j.label for j in judgments] == ["REFUTE", "SUPPORT"]
+    assert singles == ["REFUTE-0", "SUPPORT-1"]
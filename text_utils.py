@@ -0,0 +1,17 @@
+"""Text helpers shared by chunking, retrieval, reranking and the claim index."""
+from typing import Set
+import re
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "of", "to", "in", "on", "at",
+    "for", "by", "with", "and", "or", "that", "this", "it", "as", "from", "has", "have", "had",
+    "not", "no", "will", "can", "its", "their", "than", "more", "about", "up",
+})
+
+def numbers(text: str) -> Set[str]:
+    """Numbers mentioned in `text`, with thousands separators removed."""
+    return {n.replace(",", "") for n in re.findall(r"\d[\d,]*(?:\.\d+)?", text or "")}
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text or "") // 4 + 1
@@ -1,6 +1,6 @@
 import streamlit as st
 from claims import Claim
-from stance import StanceJudgment
+from stance import SKIPPED_LABEL, StanceJudgment
 from scoring import RiskAssessment
 from typing import List
 
@@ -30,6 +30,9 @@ def render_result_card(claim: Claim, judgments: List[StanceJudgment], assessment
         st.markdown("##### **Evidence Tiles**")
         if judgments:
             for j in judgments:
+                if j.label == SKIPPED_LABEL:
+                    st.caption(f"Not assessed (verdict already settled): {j.evidence_url}")
+                    continue
                 with st.expander(f"{j.label} from {j.evidence_url}"):
                     st.markdown(f"**Confidence:** {j.confidence:.2f}")
                     st.markdown(f"**Quote:** \"{j.quote_span}\"")